@@ -5,17 +5,56 @@ Each agent (Supervisor, Researcher, Writer, Critic) is exposed as an
 A2A-compatible endpoint that can be called by other agents or external systems.
 """
 
-import json
+import time
+import asyncio
 import uuid
+import hashlib
 import logging
 from datetime import datetime, timezone
 
-from django.http import JsonResponse
+import msgspec
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
+from linkedin_agent.utils import body_etag, is_approval, jresp, json_dumps, static_jresp, word_count
+
 logger = logging.getLogger(__name__)
 
+
+# A2A request shapes - decoded and validated in one pass by msgspec
+class A2APart(msgspec.Struct):
+    type: str = "application/json"
+    data: dict = {}
+
+
+class A2AMessage(msgspec.Struct):
+    parts: list[A2APart] = []
+
+    @property
+    def data(self) -> dict:
+        """Payload of the first part, which is what the agent handlers consume."""
+        return self.parts[0].data if self.parts else {}
+
+
+class A2AInvokeRequest(msgspec.Struct):
+    id: str | int | None = None
+    message: A2AMessage = msgspec.field(default_factory=A2AMessage)
+
+
+class A2ABatchTask(A2AInvokeRequest):
+    agent: str = ""
+
+
+class A2ABatchRequest(msgspec.Struct):
+    tasks: list[A2ABatchTask]
+
+
+_invoke_decoder = msgspec.json.Decoder(A2AInvokeRequest)
+_batch_decoder = msgspec.json.Decoder(A2ABatchRequest)
+
 # A2A Agent Cards - describe each agent's capabilities
 AGENT_CARDS = {
     "supervisor": {
@@ -125,165 +164,370 @@ AGENT_CARDS = {
     },
 }
 
+# Agent cards never change at runtime, so encode them once at import
+_CARD_BYTES = {name: json_dumps(card) for name, card in AGENT_CARDS.items()}
+_LIST_BYTES = json_dumps({"agents": list(AGENT_CARDS.values())})
+_CARD_ETAGS = {name: body_etag(body) for name, body in _CARD_BYTES.items()}
+_LIST_ETAG = body_etag(_LIST_BYTES)
+A2A_CARD_MAX_AGE = 300
+
+# How long (seconds) a cached handler output is served as fresh, per agent
+A2A_CACHE_TTL = {
+    "supervisor": 10,
+    "researcher": 600,
+    "writer": 60,
+    "critic": 60,
+    "evaluator": 300,
+}
+# Entries are kept well past their TTL so a stale copy can stand in when
+# the LLM / search provider errors out
+A2A_STALE_TTL = 24 * 60 * 60
+
+# Handlers finishing faster than this report their start time as completion time
+A2A_TIMESTAMP_REFRESH_S = 0.05
+
+# Upper bound on tasks accepted by a single batch invoke
+A2A_BATCH_MAX_TASKS = 10
+
+# How long (seconds) task state stays available to the status endpoint
+A2A_TASK_TTL = 60 * 60
+
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def a2a_agent_card(request, agent_name):
     """Return the A2A agent card for a specific agent."""
-    card = AGENT_CARDS.get(agent_name)
-    if not card:
-        return JsonResponse({"error": f"Unknown agent: {agent_name}"}, status=404)
-    return JsonResponse(card)
+    body = _CARD_BYTES.get(agent_name)
+    if body is None:
+        return jresp({"error": f"Unknown agent: {agent_name}"}, status=404)
+    return static_jresp(request, body, _CARD_ETAGS[agent_name], A2A_CARD_MAX_AGE)
 
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def a2a_agents_list(request):
     """List all available A2A agents."""
-    return JsonResponse({"agents": list(AGENT_CARDS.values())})
+    return static_jresp(request, _LIST_BYTES, _LIST_ETAG, A2A_CARD_MAX_AGE)
+
+
+def _read_body(request):
+    """
+    Read the request body straight off the stream rather than caching
+    request.body, or None if it exceeds DATA_UPLOAD_MAX_MEMORY_SIZE.
+    request.read() bypasses Django's size check, and a chunked body has no
+    CONTENT_LENGTH to check, so at most one byte past the limit is read.
+    """
+    limit = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+    if int(request.META.get("CONTENT_LENGTH") or 0) > limit:
+        return None
+    raw = request.read(limit + 1)
+    return None if len(raw) > limit else raw
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def a2a_agent_invoke(request, agent_name):
+async def a2a_agent_invoke(request, agent_name):
     """
     Invoke an A2A agent with a task.
     Follows the A2A task lifecycle: submitted -> working -> completed/failed.
     """
-    if agent_name not in AGENT_CARDS:
-        return JsonResponse({"error": f"Unknown agent: {agent_name}"}, status=404)
+    entry = _AGENT_TABLE.get(agent_name)
+    if entry is None:
+        return jresp({"error": f"Unknown agent: {agent_name}"}, status=404)
+    _, handler = entry
+
+    raw = _read_body(request)
+    if raw is None:
+        return jresp({
+            "jsonrpc": "2.0",
+            "error": {"code": -32600, "message": "Request body too large"},
+        }, status=413)
 
     try:
-        body = json.loads(request.body)
-        task_id = body.get("id", str(uuid.uuid4()))
-        message = body.get("message", {})
-
-        # Create A2A task response
-        task = {
-            "id": task_id,
-            "status": {
-                "state": "working",
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-            "artifacts": [],
-        }
+        body = _invoke_decoder.decode(raw)
+    except msgspec.DecodeError as e:
+        return jresp({
+            "jsonrpc": "2.0",
+            "error": {"code": -32602, "message": f"Invalid request: {e}"},
+        }, status=400)
 
-        handler = A2A_HANDLERS.get(agent_name)
-        if handler:
-            result = handler(message, request)
-            task["status"]["state"] = "completed"
-            task["artifacts"] = [
-                {
-                    "name": f"{agent_name}_output",
-                    "parts": [{"type": "application/json", "data": result}],
-                }
-            ]
-        else:
-            task["status"]["state"] = "failed"
-            task["status"]["message"] = f"No handler for agent: {agent_name}"
-
-        task["status"]["timestamp"] = datetime.now(timezone.utc).isoformat()
-        return JsonResponse({"jsonrpc": "2.0", "result": task})
+    task_id = body.id if body.id is not None else str(uuid.uuid4())
+    try:
+        task, cache_status = await _run_task(agent_name, handler, task_id, body.message.data, request)
+        response = jresp({"jsonrpc": "2.0", "result": task})
+        if cache_status:
+            response["X-Cache"] = cache_status
+        return response
 
     except Exception as e:
         logger.error(f"A2A invoke error for {agent_name}: {e}", exc_info=True)
-        return JsonResponse({
+        return jresp({
             "jsonrpc": "2.0",
             "error": {"code": -32000, "message": str(e)},
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["POST"])
+async def a2a_batch_invoke(request):
+    """
+    Invoke several A2A agents in one round trip.
+    Tasks run concurrently; results come back in request order, and a
+    failing task is reported as failed without affecting the others.
+    """
+    raw = _read_body(request)
+    if raw is None:
+        return jresp({
+            "jsonrpc": "2.0",
+            "error": {"code": -32600, "message": "Request body too large"},
+        }, status=413)
+
+    try:
+        body = _batch_decoder.decode(raw)
+    except msgspec.DecodeError as e:
+        return jresp({
+            "jsonrpc": "2.0",
+            "error": {"code": -32602, "message": f"Invalid request: {e}"},
+        }, status=400)
+
+    if len(body.tasks) > A2A_BATCH_MAX_TASKS:
+        return jresp({
+            "jsonrpc": "2.0",
+            "error": {"code": -32602, "message": f"At most {A2A_BATCH_MAX_TASKS} tasks per batch"},
+        }, status=400)
+
+    tasks = await asyncio.gather(*[_run_batch_task(item, request) for item in body.tasks])
+    return jresp({"jsonrpc": "2.0", "result": tasks})
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
-def a2a_task_status(request, task_id):
+async def a2a_task_status(request, task_id):
     """Check the status of an A2A task."""
-    # For synchronous execution, tasks complete immediately
-    return JsonResponse({
-        "jsonrpc": "2.0",
-        "result": {
+    key = await _task_key(request, task_id)
+    body = await cache.aget(key) if key else None
+    if body is None:
+        return jresp({
+            "jsonrpc": "2.0",
+            "error": {"code": -32001, "message": f"Task not found: {task_id}"},
+        }, status=404)
+    # Task state is stored pre-encoded, so polls don't re-serialise it
+    return HttpResponse(b'{"jsonrpc":"2.0","result":' + body + b"}", content_type="application/json")
+
+
+async def _task_key(request, task_id):
+    """
+    Cache key of a task's state, scoped to the caller since task ids are
+    client-chosen. None for anonymous callers: they would all share one
+    namespace, so their tasks are returned inline but never stored.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    return f"a2a:task:{user.id}:{task_id}"
+
+
+async def _save_task(request, task):
+    key = await _task_key(request, task["id"])
+    if key:
+        await cache.aset(key, json_dumps(task), timeout=A2A_TASK_TTL)
+
+
+async def _run_task(agent_name, handler, task_id, data, request):
+    """
+    Run one A2A task through the response cache and build its task object.
+    Returns (task, cache_status); handler exceptions propagate.
+    """
+    started = time.perf_counter()
+    ts = datetime.now(timezone.utc).isoformat()
+    task = {
+        "id": task_id,
+        "status": {
+            "state": "working",
+            "timestamp": ts,
+        },
+        "artifacts": [],
+    }
+    await _save_task(request, task)
+
+    cache_status = None
+    if handler:
+        try:
+            result, cache_status = await _invoke_cached(agent_name, handler, data, request)
+        except Exception as e:
+            task["status"] = {
+                "state": "failed",
+                "message": str(e),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+            await _save_task(request, task)
+            raise
+        # Only re-read the clock when the handler did real (LLM / network) work
+        if time.perf_counter() - started > A2A_TIMESTAMP_REFRESH_S:
+            ts = datetime.now(timezone.utc).isoformat()
+        task["status"]["state"] = "completed"
+        task["artifacts"] = [
+            {
+                "name": f"{agent_name}_output",
+                "parts": [{"type": "application/json", "data": result}],
+            }
+        ]
+    else:
+        task["status"]["state"] = "failed"
+        task["status"]["message"] = f"No handler for agent: {agent_name}"
+
+    task["status"]["timestamp"] = ts
+    await _save_task(request, task)
+    return task, cache_status
+
+
+async def _run_batch_task(item, request):
+    """Run one entry of a batch invoke, folding errors into a failed task."""
+    task_id = item.id if item.id is not None else str(uuid.uuid4())
+    entry = _AGENT_TABLE.get(item.agent)
+    if entry is None:
+        task = {
             "id": task_id,
-            "status": {"state": "completed"},
+            "status": {
+                "state": "failed",
+                "message": f"Unknown agent: {item.agent}",
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            },
+            "artifacts": [],
         }
-    })
+        await _save_task(request, task)
+        return task
+
+    try:
+        task, _ = await _run_task(item.agent, entry[1], task_id, item.message.data, request)
+    except Exception as e:
+        logger.error(f"A2A batch invoke error for {item.agent}: {e}", exc_info=True)
+        # _run_task has already recorded the failure
+        task = {
+            "id": task_id,
+            "status": {
+                "state": "failed",
+                "message": str(e),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            },
+            "artifacts": [],
+        }
+    return task
+
+
+async def _invoke_cached(agent_name, handler, data, request):
+    """
+    Run an A2A handler through the response cache.
+    Returns (result, cache_status) where cache_status is HIT, MISS or STALE.
+    """
+    user = await request.auser()
+    raw = json_dumps({"agent": agent_name, "data": data, "uid": user.id}, sort_keys=True)
+    key = f"a2a:resp:{hashlib.blake2b(raw, digest_size=16).hexdigest()}"
+
+    entry = await cache.aget(key)
+    if entry is not None and entry[0] > time.time():
+        return entry[1], "HIT"
+
+    try:
+        result = await handler(data, request)
+    except Exception:
+        if entry is None:
+            raise
+        logger.warning(f"A2A {agent_name} handler failed, serving stale result", exc_info=True)
+        return entry[1], "STALE"
+
+    # Don't cache configuration errors - they should clear as soon as the user fixes them
+    if not (isinstance(result, dict) and "error" in result):
+        await cache.aset(key, (time.time() + A2A_CACHE_TTL[agent_name], result), timeout=A2A_STALE_TTL)
+    return result, "MISS"
+
+
+_MISSING = object()
+
+
+async def _get_config(request):
+    """Fetch the caller's API configuration once per request."""
+    config = getattr(request, "_api_config", _MISSING)
+    if config is _MISSING:
+        config = None
+        user = await request.auser()
+        if user.is_authenticated:
+            from linkedin_agent.services.config import aget_llm_config
+            config = await aget_llm_config(user.id)
+        request._api_config = config
+    return config
 
 
 # --- A2A Agent Handlers ---
 
-def _a2a_supervisor(message, request):
+async def _a2a_supervisor(data, request):
     """Supervisor agent handler for A2A."""
-    data = message.get("parts", [{}])[0].get("data", {})
-    from linkedin_agent.agents.workflow import LinkedInPostWorkflow
-    from linkedin_agent.api.models import APIConfiguration
-
-    config = APIConfiguration.objects.filter(user=request.user).first() if request.user.is_authenticated else None
+    config = await _get_config(request)
     if not config:
         return {"error": "No API configuration found"}
 
-    # Mimic supervisor decision logic
-    research = data.get("research_findings", [])
-    revision = data.get("revision_number", 0)
-    has_research = len(research) > 0
-    has_draft = bool(data.get("draft", "").strip())
-    critique = data.get("critique_notes", "")
+    # Mimic supervisor decision logic - read every input once up front
+    has_research = bool(data.get("research_findings"))
+    has_draft = bool((data.get("draft") or "").strip())
+    critique = data.get("critique_notes") or ""
+    is_approved = is_approval(critique)
 
-    if "APPROVED" in critique.upper() and has_draft:
+    if is_approved and has_draft:
         return {"next_step": "END", "task_description": "Draft approved"}
     elif not has_research:
         return {"next_step": "researcher", "task_description": f"Research: {data.get('main_task', '')}"}
-    elif has_research and not has_draft:
+    elif not has_draft:
         return {"next_step": "writer", "task_description": "Write first draft"}
-    elif critique and "APPROVED" not in critique.upper() and revision < 5:
+    elif critique and not is_approved and data.get("revision_number", 0) < 5:
         return {"next_step": "writer", "task_description": "Revise based on feedback"}
     else:
         return {"next_step": "END", "task_description": "Finalizing"}
 
 
-def _a2a_researcher(message, request):
+async def _a2a_researcher(data, request):
     """Researcher agent handler for A2A."""
-    data = message.get("parts", [{}])[0].get("data", {})
     query = data.get("query", data.get("topic", ""))
 
-    from linkedin_agent.api.models import APIConfiguration
-    config = APIConfiguration.objects.filter(user=request.user).first() if request.user.is_authenticated else None
+    config = await _get_config(request)
     if not config or not config.tavily_api_key:
-        return {"findings": f"General research on: {query}"}
+        # An error result, not a placeholder finding, so _invoke_cached doesn't keep it
+        return {"error": "No Tavily API key configured"}
 
-    from langchain_tavily import TavilySearch
-    from langchain_openai import ChatOpenAI
+    from linkedin_agent.agents.clients import get_llm, get_tavily
 
-    tool = TavilySearch(max_results=5, topic="general", search_depth="basic", api_key=config.tavily_api_key)
-    results = tool.invoke({"query": query})
+    results = await get_tavily(config.tavily_api_key).ainvoke({"query": query})
+    llm = get_llm(config.openai_api_key, config.openai_model, config.openai_base_url)
 
-    llm_kwargs = {"model": config.openai_model, "temperature": 0, "api_key": config.openai_api_key}
-    if config.openai_base_url:
-        llm_kwargs["base_url"] = config.openai_base_url
-    llm = ChatOpenAI(**llm_kwargs)
+    # TavilySearch returns the raw response dict; older versions returned the list
+    if isinstance(results, dict):
+        if results.get("error"):
+            # Search failures come back as {"error": ...}; don't summarize (and cache) nothing
+            return {"error": f"Research failed: {results['error']}"}
+        results = results.get("results", [])
+    top = [r for r in results[:3] if isinstance(r, dict)]
 
-    summary_prompt = f"Summarize key findings (5-7 bullet points) about '{query}':\n{json.dumps(results[:3], default=str)}"
-    response = llm.invoke(summary_prompt)
+    # Hand the LLM plain bullets rather than a JSON dump - fewer tokens, same facts
+    bullets = "\n".join(f"- {r.get('title', '')}: {r.get('content', '')[:500]}" for r in top)
+    summary_prompt = f"Summarize key findings (5-7 bullet points) about '{query}':\n{bullets}"
+    response = await llm.ainvoke(summary_prompt)
 
-    return {"findings": response.content, "sources": results[:3]}
+    return {"findings": response.content, "sources": top}
 
 
-def _a2a_writer(message, request):
+async def _a2a_writer(data, request):
     """Writer agent handler for A2A."""
-    data = message.get("parts", [{}])[0].get("data", {})
 
-    from linkedin_agent.api.models import APIConfiguration
-    from linkedin_agent.agents.prompts import WRITER_PROMPT
-    from langchain_openai import ChatOpenAI
+    from linkedin_agent.agents.clients import get_llm
+    from linkedin_agent.agents.prompts import format_writer
 
-    config = APIConfiguration.objects.filter(user=request.user).first() if request.user.is_authenticated else None
+    config = await _get_config(request)
     if not config or not config.openai_api_key:
         return {"error": "No API configuration found"}
 
-    llm_kwargs = {"model": config.openai_model, "temperature": 0, "api_key": config.openai_api_key}
-    if config.openai_base_url:
-        llm_kwargs["base_url"] = config.openai_base_url
-    llm = ChatOpenAI(**llm_kwargs)
+    llm = get_llm(config.openai_api_key, config.openai_model, config.openai_base_url)
 
     research = data.get("research_findings", [])
-    prompt = WRITER_PROMPT.format(
+    prompt = format_writer(
         main_task=data.get("main_task", ""),
         research_findings="\n\n".join(research) if research else "No research.",
         draft=data.get("draft", ""),
@@ -299,28 +543,23 @@ def _a2a_writer(message, request):
         template_instructions=data.get("template_instructions", ""),
     )
 
-    response = llm.invoke(prompt)
-    return {"draft": response.content, "word_count": len(response.content.split())}
+    response = await llm.ainvoke(prompt)
+    return {"draft": response.content, "word_count": word_count(response.content)}
 
 
-def _a2a_critic(message, request):
+async def _a2a_critic(data, request):
     """Critic agent handler for A2A."""
-    data = message.get("parts", [{}])[0].get("data", {})
 
-    from linkedin_agent.api.models import APIConfiguration
-    from linkedin_agent.agents.prompts import CRITIC_PROMPT
-    from langchain_openai import ChatOpenAI
+    from linkedin_agent.agents.clients import get_llm
+    from linkedin_agent.agents.prompts import format_critic
 
-    config = APIConfiguration.objects.filter(user=request.user).first() if request.user.is_authenticated else None
+    config = await _get_config(request)
     if not config or not config.openai_api_key:
         return {"error": "No API configuration found"}
 
-    llm_kwargs = {"model": config.openai_model, "temperature": 0, "api_key": config.openai_api_key}
-    if config.openai_base_url:
-        llm_kwargs["base_url"] = config.openai_base_url
-    llm = ChatOpenAI(**llm_kwargs)
+    llm = get_llm(config.openai_api_key, config.openai_model, config.openai_base_url)
 
-    prompt = CRITIC_PROMPT.format(
+    prompt = format_critic(
         main_task=data.get("main_task", ""),
         draft=data.get("draft", ""),
         tone=data.get("tone", "professional"),
@@ -329,19 +568,17 @@ def _a2a_critic(message, request):
         word_count_max=data.get("word_count_max", 300),
     )
 
-    response = llm.invoke(prompt)
-    approved = "APPROVED" in response.content.upper()
+    response = await llm.ainvoke(prompt)
+    approved = is_approval(response.content)
     return {"critique": response.content, "approved": approved}
 
 
-def _a2a_evaluator(message, request):
+async def _a2a_evaluator(data, request):
     """Evaluator agent handler for A2A."""
-    data = message.get("parts", [{}])[0].get("data", {})
 
-    from linkedin_agent.api.models import APIConfiguration
     from linkedin_agent.agents.workflow import LinkedInPostWorkflow
 
-    config = APIConfiguration.objects.filter(user=request.user).first() if request.user.is_authenticated else None
+    config = await _get_config(request)
     if not config or not config.openai_api_key:
         return {"error": "No API configuration found"}
 
@@ -350,7 +587,7 @@ def _a2a_evaluator(message, request):
         openai_base_url=config.openai_base_url,
         eval_model_name=config.openai_eval_model,
     )
-    return workflow.evaluate_groundedness(
+    return await workflow.aevaluate_groundedness(
         draft=data.get("draft", ""),
         research_findings=data.get("research_findings", []),
     )
@@ -363,3 +600,6 @@ A2A_HANDLERS = {
     "critic": _a2a_critic,
     "evaluator": _a2a_evaluator,
 }
+
+# Single lookup per invoke: agent name -> (card, handler or None)
+_AGENT_TABLE = {name: (card, A2A_HANDLERS.get(name)) for name, card in AGENT_CARDS.items()}
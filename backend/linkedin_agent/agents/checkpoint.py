@@ -0,0 +1,66 @@
+"""
+LangGraph checkpointing in the application's Postgres database.
+A run that stops part way and is retried under the same thread id resumes
+after its last completed node instead of paying for research and drafting
+again: generate_post_task is acknowledged late, so a task lost with its
+worker is redelivered, and it retries when the nodes surface a transient
+provider error (clients.TRANSIENT_ERRORS). A thread's checkpoints are deleted
+once its run has finished for good (see delete_checkpoints).
+"""
+
+import logging
+from contextlib import AsyncExitStack, asynccontextmanager
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+_tables_ready = False
+
+# AsyncPostgresSaver's tables; langgraph-checkpoint-postgres 2.0 has no delete API
+CHECKPOINT_TABLES = ("checkpoint_writes", "checkpoint_blobs", "checkpoints")
+
+
+def checkpoints_enabled() -> bool:
+    return bool(settings.AGENT_CONFIG.get("CHECKPOINTS", True)) and settings.DATABASE_URL.startswith(
+        ("postgres://", "postgresql://")
+    )
+
+
+@asynccontextmanager
+async def open_checkpointer():
+    """
+    Yield an AsyncPostgresSaver on the default database, or None when
+    checkpointing is disabled or the database can't be reached - the
+    workflow then simply runs without checkpoints.
+    """
+    global _tables_ready
+    async with AsyncExitStack() as stack:
+        saver = None
+        if checkpoints_enabled():
+            try:
+                # psycopg 3 is only needed once checkpointing is actually used
+                from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+
+                saver = await stack.enter_async_context(AsyncPostgresSaver.from_conn_string(settings.DATABASE_URL))
+                if not _tables_ready:
+                    await saver.setup()
+                    _tables_ready = True
+            except Exception as e:
+                logger.warning(f"Workflow checkpointer unavailable: {e}")
+                saver = None
+        yield saver
+
+
+def delete_checkpoints(thread_id: str):
+    """Drop a thread's checkpoints once nothing will resume it (run completed or failed for good)."""
+    if not thread_id or not checkpoints_enabled():
+        return
+    try:
+        # Savepoint: a missing table (setup never ran) must not break a surrounding transaction
+        with transaction.atomic(), connection.cursor() as cursor:
+            for table in CHECKPOINT_TABLES:
+                cursor.execute(f"DELETE FROM {table} WHERE thread_id = %s", [thread_id])
+    except DatabaseError as e:
+        logger.warning(f"Deleting checkpoints of thread {thread_id} failed: {e}")
@@ -0,0 +1,71 @@
+"""
+Shared LLM and search clients.
+Building a ChatOpenAI sets up its HTTP connection pool and auth headers, so
+clients are reused per (api_key, model, base_url, ...) instead of per request
+or per workflow instance.
+"""
+
+import asyncio
+import functools
+import weakref
+from typing import Optional
+
+import aiohttp
+import httpx
+import openai
+from langchain_openai import ChatOpenAI
+from langchain_tavily import TavilySearch
+
+CLIENT_CACHE_SIZE = 64
+
+# Provider failures worth another attempt. The workflow nodes let these
+# propagate instead of degrading the output, so the Celery task retries
+# and resumes the run from its checkpoint. Anything else (bad key, invalid
+# request) is handled inside the node or fails the task straight away.
+TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    httpx.TransportError,
+    aiohttp.ClientConnectionError,  # TavilySearch's transport
+    openai.APIConnectionError,
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+def _build_llm(
+    api_key: str, model: str, base_url: str = "", temperature: float = 0, max_tokens: Optional[int] = None,
+) -> ChatOpenAI:
+    llm_kwargs = {"model": model, "temperature": temperature, "max_tokens": max_tokens, "api_key": api_key}
+    if base_url:
+        llm_kwargs["base_url"] = base_url
+    return ChatOpenAI(**llm_kwargs)
+
+
+# The async httpx pool inside ChatOpenAI is bound to the event loop it first
+# ran on, so clients used from async code are pooled per loop. Celery tasks
+# going through async_to_sync get a fresh loop each call; their pools are
+# dropped together with the loop.
+_sync_llms = functools.lru_cache(maxsize=CLIENT_CACHE_SIZE)(_build_llm)
+_loop_llms = weakref.WeakKeyDictionary()
+
+
+def get_llm(
+    api_key: str, model: str, base_url: str = "", temperature: float = 0, max_tokens: Optional[int] = None,
+) -> ChatOpenAI:
+    """Return a shared ChatOpenAI client for these credentials and settings."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return _sync_llms(api_key, model, base_url or "", temperature, max_tokens)
+
+    pool = _loop_llms.get(loop)
+    if pool is None:
+        pool = _loop_llms[loop] = functools.lru_cache(maxsize=CLIENT_CACHE_SIZE)(_build_llm)
+    return pool(api_key, model, base_url or "", temperature, max_tokens)
+
+
+@functools.lru_cache(maxsize=CLIENT_CACHE_SIZE)
+def get_tavily(api_key: str, max_results: int = 5) -> TavilySearch:
+    """Return a shared TavilySearch tool (it opens a new HTTP session per call)."""
+    return TavilySearch(max_results=max_results, topic="general", search_depth="basic", tavily_api_key=api_key)
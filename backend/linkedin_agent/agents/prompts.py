@@ -1,5 +1,7 @@
 """All agent prompt templates - extracted and enhanced from the notebook."""
 
+from string import Formatter
+
 SUPERVISOR_PROMPT = """You are a content project supervisor managing a LinkedIn post creation workflow.
 
 Current Task: {main_task}
@@ -50,16 +52,20 @@ Summarize your findings concisely, avoiding jargon. Include short citations or l
 Provide a concise summary of key findings (5-7 bullet points).
 """
 
+# Writer and critic prompts keep everything that is fixed for a run (instructions,
+# configuration, research) ahead of the draft / critique that change on every
+# revision, so the provider's prompt-prefix cache can reuse the leading tokens.
 WRITER_PROMPT = """You are a professional LinkedIn post writer.
 
-Main Task: {main_task}
-
-Research Findings:
-{research_findings}
-
-Current Draft: {draft}
-
-Critique Notes: {critique_notes}
+Instructions:
+- If this is the first draft (no current draft), create a comprehensive LinkedIn post based on the findings
+- If there is a current draft and critique notes, revise the draft to address ALL feedback
+- Structure the post with clear sections: Hook/Introduction, Insights, Lessons/Tips, Takeaway, Conclusion
+- Use the specified tone consistently throughout
+- Make the post concise (aim for {word_count_min}-{word_count_max} words)
+- End with a thought-provoking question or call-to-action if configured
+- Add relevant hashtags at the end if configured (3-5 hashtags)
+- Write in {language}
 
 Post Configuration:
 - Tone: {tone}
@@ -72,15 +78,14 @@ Post Configuration:
 
 {template_instructions}
 
-Instructions:
-- If this is the first draft (no current draft), create a comprehensive LinkedIn post based on the findings
-- If there is a current draft and critique notes, revise the draft to address ALL feedback
-- Structure the post with clear sections: Hook/Introduction, Insights, Lessons/Tips, Takeaway, Conclusion
-- Use the specified tone consistently throughout
-- Make the post concise (aim for {word_count_min}-{word_count_max} words)
-- End with a thought-provoking question or call-to-action if configured
-- Add relevant hashtags at the end if configured (3-5 hashtags)
-- Write in {language}
+Main Task: {main_task}
+
+Research Findings:
+{research_findings}
+
+Current Draft: {draft}
+
+Critique Notes: {critique_notes}
 
 Write the complete LinkedIn post now:
 """
@@ -94,9 +99,6 @@ Post Configuration:
 - Target Audience: {target_audience}
 - Word Count Target: {word_count_min}-{word_count_max} words
 
-Draft to Review:
-{draft}
-
 Evaluate the draft based on:
 1. Hook Strength - Does the opening grab attention within the first 2 lines?
 2. Clarity - Is the message easy to understand for the target audience?
@@ -111,9 +113,33 @@ Provide your evaluation:
 - If the draft is satisfactory (minor issues are okay), respond with: "APPROVED - [brief positive comment]"
 - If the draft needs improvement, provide specific, actionable feedback for revision
 
+Draft to Review:
+{draft}
+
 Your response:
 """
 
+CANDIDATE_RANKING_PROMPT = """You are a critical reviewer choosing the best of several candidate LinkedIn posts.
+
+Main Task: {main_task}
+
+Post Configuration:
+- Tone: {tone}
+- Target Audience: {target_audience}
+- Word Count Target: {word_count_min}-{word_count_max} words
+
+Score each candidate from 0 to 10 on hook strength, clarity, value, structure,
+engagement potential, tone consistency, word count and LinkedIn best practices.
+For each candidate give specific, actionable feedback for revision.
+
+{candidates}
+
+Respond ONLY with a JSON array, one object per candidate:
+[
+  {{"index": 0, "score": X, "feedback": "..."}}
+]
+"""
+
 GROUNDEDNESS_PROMPT = """You are a Groundedness Checker AI.
 
 Your job is to evaluate whether the draft is fully supported by the given research findings.
@@ -186,3 +212,39 @@ For each variation provide:
 
 Return as JSON array with keys: "hook", "body", "cta", "angle_description"
 """
+
+
+def compile_prompt(template: str, **fixed):
+    """
+    Pre-parse a str.format template into (literal, field, spec) parts so
+    rendering skips re-scanning the template on every call. Fields given
+    in `fixed` are substituted once here; the renderer takes the rest.
+    """
+    parts, literal_run = [], ""
+    for literal, field, spec, _ in Formatter().parse(template):
+        literal_run += literal
+        if field is None:
+            continue
+        if field in fixed:
+            literal_run += format(fixed[field], spec)
+            continue
+        parts.append((literal_run, field, spec))
+        literal_run = ""
+
+    def render(**kwargs) -> str:
+        return "".join(
+            literal + format(kwargs[field], spec) for literal, field, spec in parts
+        ) + literal_run
+
+    return render
+
+
+format_supervisor = compile_prompt(SUPERVISOR_PROMPT)
+format_researcher = compile_prompt(RESEARCHER_PROMPT)
+format_writer = compile_prompt(WRITER_PROMPT)
+format_critic = compile_prompt(CRITIC_PROMPT)
+format_candidate_ranking = compile_prompt(CANDIDATE_RANKING_PROMPT)
+format_groundedness = compile_prompt(GROUNDEDNESS_PROMPT)
+format_hashtag_generator = compile_prompt(HASHTAG_GENERATOR_PROMPT)
+format_audience_analyzer = compile_prompt(AUDIENCE_ANALYZER_PROMPT)
+format_post_variations = compile_prompt(POST_VARIATIONS_PROMPT)
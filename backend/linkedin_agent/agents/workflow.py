@@ -3,44 +3,254 @@ Multi-Agent LinkedIn Post Creator Workflow.
 Faithfully ported from the Jupyter notebook with enhancements for production use.
 """
 
-import json
 import time
+import uuid
+import asyncio
+import functools
 import logging
 from typing import TypedDict, Annotated, List, Optional, Callable
 import operator
+from dataclasses import dataclass, fields
 
+import tiktoken
+from asgiref.sync import async_to_sync, sync_to_async
+from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
 from langchain_openai import ChatOpenAI
-from langchain_tavily import TavilySearch
 from langgraph.graph import StateGraph, END
 
+from linkedin_agent.utils import is_approval, json_loads, word_count
+
+from .checkpoint import open_checkpointer
+from .clients import TRANSIENT_ERRORS, get_llm, get_tavily
 from .prompts import (
-    SUPERVISOR_PROMPT, RESEARCHER_PROMPT, WRITER_PROMPT,
-    CRITIC_PROMPT, GROUNDEDNESS_PROMPT,
+    WRITER_PROMPT, CRITIC_PROMPT, CANDIDATE_RANKING_PROMPT, compile_prompt, format_groundedness,
 )
 
 logger = logging.getLogger(__name__)
 
+# Extra search angles queried alongside the supervisor's sub-task
+RESEARCH_ANGLES = ("latest statistics and data", "recent developments and trends")
+RESEARCH_RESULTS_PER_QUERY = 2
+# Search result snippets fed to the summary prompt, in tokens
+RESEARCH_RESULT_TOKENS = 200
+RESEARCH_SNIPPET_BUDGET = 800
+
+LLM_MAX_TOKENS = 4096
+
+# Research handed to the writer is capped at roughly 1500 tokens
+RESEARCH_TEXT_MAX_CHARS = 6000
+
+# Streamed LLM chunks are forwarded to on_step in batches of this many
+STREAM_TOKEN_BATCH = 16
+
+
+@dataclass(frozen=True, slots=True)
+class PostParams:
+    """Per-run post settings - fixed for the whole run, so kept out of the mutable state."""
+    tone: str = "professional"
+    target_audience: str = "tech professionals"
+    word_count_min: int = 150
+    word_count_max: int = 300
+    language: str = "English"
+    include_hashtags: bool = True
+    include_cta: bool = True
+    include_emoji: bool = False
+    template_instructions: str = ""
+    max_revisions: int = 5
+
+    @classmethod
+    def from_kwargs(cls, kwargs: dict, max_revisions: int) -> "PostParams":
+        """Build from run()/astream() keyword arguments, ignoring unknown keys."""
+        values = {f.name: kwargs[f.name] for f in fields(cls) if f.name in kwargs}
+        values.setdefault("max_revisions", max_revisions)
+        return cls(**values)
+
+
+# Immutable starting values; list fields are created per run in _initial_state
+_EMPTY_STATE = {
+    "research_text": "",
+    "draft": "",
+    "word_count": 0,
+    "critique_notes": "",
+    "revision_number": 0,
+    "next_step": "",
+    "current_sub_task": "",
+}
+
+
+# Writer/critic templates with a run's fixed settings already substituted;
+# each revision only renders the draft, critique and research into them.
+@functools.lru_cache(maxsize=128)
+def _writer_prompt(params: PostParams, main_task: str):
+    return compile_prompt(
+        WRITER_PROMPT,
+        main_task=main_task,
+        tone=params.tone,
+        target_audience=params.target_audience,
+        word_count_min=params.word_count_min,
+        word_count_max=params.word_count_max,
+        language=params.language,
+        include_hashtags=params.include_hashtags,
+        include_cta=params.include_cta,
+        include_emoji=params.include_emoji,
+        template_instructions=params.template_instructions,
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _critic_prompt(params: PostParams, main_task: str):
+    return compile_prompt(
+        CRITIC_PROMPT,
+        main_task=main_task,
+        tone=params.tone,
+        target_audience=params.target_audience,
+        word_count_min=params.word_count_min,
+        word_count_max=params.word_count_max,
+    )
+
+
+@functools.lru_cache(maxsize=128)
+def _ranking_prompt(params: PostParams, main_task: str):
+    return compile_prompt(
+        CANDIDATE_RANKING_PROMPT,
+        main_task=main_task,
+        tone=params.tone,
+        target_audience=params.target_audience,
+        word_count_min=params.word_count_min,
+        word_count_max=params.word_count_max,
+    )
+
 
 class ResearchState(TypedDict):
     """State for the research workflow - matches notebook exactly."""
     main_task: str
     research_findings: Annotated[List[str], operator.add]
+    research_text: str  # findings joined and capped once by the researcher, reused every revision
     draft: str
+    draft_candidates: List[str]
     critique_notes: str
     revision_number: int
+    word_count: int  # of the current draft, counted once by the node that sets it
     next_step: str
     current_sub_task: str
     # Enhanced fields
-    tone: str
-    target_audience: str
-    word_count_min: int
-    word_count_max: int
-    language: str
-    include_hashtags: bool
-    include_cta: bool
-    include_emoji: bool
-    template_instructions: str
-    max_revisions: int
+    params: "PostParams"
+    prompt_cache_key: str
+
+
+def _strip_fences(text: str) -> str:
+    """Remove an opening ```lang line and a closing ``` around an LLM reply, leaving inner text alone."""
+    text = text.strip()
+    if text.startswith("```"):
+        text = text.partition("\n")[2] if "\n" in text else text.removeprefix("```")
+    return text.removesuffix("```").strip()
+
+
+def _parse_json_reply(text: str):
+    """Parse a JSON reply from the LLM, tolerating a surrounding markdown fence."""
+    return json_loads(_strip_fences(text))
+
+
+def parse_groundedness(content: str) -> dict:
+    """Parse the groundedness checker's JSON reply."""
+    return _parse_json_reply(content)
+
+
+# Seconds before another attempt at loading tiktoken after a failure
+ENCODER_RETRY_SECONDS = 300
+
+_encoding = None
+_encoder_retry_at = 0.0
+
+
+def _encoder():
+    """
+    tiktoken encoding for snippet budgets, or None if it can't be loaded (first
+    use downloads it). Only a loaded encoding is kept; after a failure the load
+    is retried once ENCODER_RETRY_SECONDS have passed.
+    """
+    global _encoding, _encoder_retry_at
+    if _encoding is None and time.monotonic() >= _encoder_retry_at:
+        try:
+            _encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            _encoder_retry_at = time.monotonic() + ENCODER_RETRY_SECONDS
+            logger.warning(f"tiktoken unavailable, budgeting snippets by characters: {e}")
+    return _encoding
+
+
+def _truncate_tokens(text: str, limit: int, encoder) -> tuple:
+    """Cut `text` to at most `limit` tokens; returns (text, tokens used)."""
+    if encoder is None:
+        # Roughly four characters per token
+        if len(text) <= limit * 4:
+            return text, -(-len(text) // 4)
+        return text[:limit * 4] + "...", limit
+    tokens = encoder.encode(text)
+    if len(tokens) <= limit:
+        return text, len(tokens)
+    return encoder.decode(tokens[:limit]) + "...", limit
+
+
+def _cap_research(findings: List[str], limit: int = RESEARCH_TEXT_MAX_CHARS) -> str:
+    """Join findings for the writer prompt, dropping whole trailing lines past `limit` chars."""
+    text = "\n\n".join(findings)
+    if len(text) <= limit:
+        return text
+    kept, size = [], 0
+    for line in text.splitlines():
+        size += len(line) + 1
+        if size > limit:
+            break
+        kept.append(line)
+    return "\n".join(kept) or text[:limit]
+
+
+# The graph's shape never changes, so it is built and compiled once per process.
+# Nodes find the LinkedInPostWorkflow they run for in the invocation config.
+WORKFLOW_CONFIG_KEY = "workflow"
+
+
+def _node(method_name: str):
+    async def node(state: ResearchState, config: RunnableConfig) -> dict:
+        return await getattr(config["configurable"][WORKFLOW_CONFIG_KEY], method_name)(state)
+    node.__name__ = method_name
+    return node
+
+
+@functools.lru_cache(maxsize=1)
+def _graph_builder() -> StateGraph:
+    """The LangGraph workflow - mirrors notebook exactly."""
+    workflow = StateGraph(ResearchState)
+
+    workflow.add_node("supervisor", _node("_supervisor_node"))
+    workflow.add_node("researcher", _node("_research_node"))
+    workflow.add_node("writer", _node("_write_node"))
+    workflow.add_node("critiquer", _node("_critique_node"))
+
+    workflow.set_entry_point("supervisor")
+
+    workflow.add_edge("researcher", "supervisor")
+    workflow.add_edge("writer", "critiquer")
+    workflow.add_edge("critiquer", "supervisor")
+
+    workflow.add_conditional_edges(
+        "supervisor",
+        lambda state: state.get("next_step", "researcher"),
+        {
+            "researcher": "researcher",
+            "writer": "writer",
+            "END": END,
+        },
+    )
+    return workflow
+
+
+@functools.lru_cache(maxsize=1)
+def _compiled_graph():
+    """Compiled graph for runs without checkpointing."""
+    return _graph_builder().compile()
 
 
 class LinkedInPostWorkflow:
@@ -55,112 +265,120 @@ class LinkedInPostWorkflow:
         tavily_api_key: str = "",
         max_revisions: int = 5,
         on_step: Optional[Callable] = None,
+        cache=None,
+        draft_candidates: int = 1,
+        candidate_approval_score: float = 8,
     ):
-        self.on_step = on_step  # callback for real-time updates
+        self.on_step = on_step  # callback for real-time updates (sync or async)
+        # Wrapped once here rather than on every step; sync callbacks (ORM
+        # writes etc.) run back on the caller's thread
+        if on_step is None or asyncio.iscoroutinefunction(on_step):
+            self._on_step_async = on_step
+        else:
+            self._on_step_async = sync_to_async(on_step)
+        self.cache = cache  # optional semantic cache, see services.semantic_cache
         self.max_revisions = max_revisions
         self.step_counter = 0
-
-        # Primary LLM
-        llm_kwargs = {
-            "model": model_name,
-            "temperature": 0,
-            "max_tokens": 4096,
-            "api_key": openai_api_key,
-        }
-        if openai_base_url:
-            llm_kwargs["base_url"] = openai_base_url
-        self.llm = ChatOpenAI(**llm_kwargs)
-
-        # Eval LLM
-        eval_kwargs = {
-            "model": eval_model_name,
-            "temperature": 0,
-            "max_tokens": 4096,
-            "api_key": openai_api_key,
-        }
-        if openai_base_url:
-            eval_kwargs["base_url"] = openai_base_url
-        self.eval_llm = ChatOpenAI(**eval_kwargs)
-
-        # Tavily search tool
-        self.tavily_tool = None
-        if tavily_api_key:
-            self.tavily_tool = TavilySearch(
-                max_results=5,
-                topic="general",
-                include_answer=False,
-                include_raw_content=False,
-                search_depth="basic",
-                api_key=tavily_api_key,
-            )
-
-        # Build the graph
-        self.app = self._build_graph()
-
-    def _emit_step(self, agent_name: str, data: dict):
+        # First drafts are sampled this many times in one request and ranked by the critic
+        self.draft_candidates = max(1, draft_candidates)
+        self.candidate_approval_score = candidate_approval_score
+        # prompt_cache_key is an OpenAI extension; OpenAI-compatible servers may reject it
+        self.use_prompt_cache_key = not openai_base_url
+
+        # LLM clients are shared across workflow instances with the same settings
+        self._llm_args = (openai_api_key, model_name, openai_base_url)
+        self._eval_llm_args = (openai_api_key, eval_model_name, openai_base_url)
+        self.tavily_tool = get_tavily(tavily_api_key) if tavily_api_key else None
+
+    # Looked up on use rather than stored: get_llm pools clients per event loop,
+    # and run() gives every call a fresh loop
+    @property
+    def llm(self) -> ChatOpenAI:
+        return get_llm(*self._llm_args, max_tokens=LLM_MAX_TOKENS)
+
+    @property
+    def eval_llm(self) -> ChatOpenAI:
+        return get_llm(*self._eval_llm_args, max_tokens=LLM_MAX_TOKENS)
+
+    async def _emit_step(self, agent_name: str, data: dict):
         self.step_counter += 1
         if self.on_step:
-            self.on_step({
+            await self._call_on_step({
                 "step": self.step_counter,
                 "agent": agent_name,
                 **data,
             })
 
-    def _supervisor_node(self, state: ResearchState) -> dict:
-        """Supervisor decides the next step - deterministic first, LLM fallback."""
-        start = time.time()
-        research = state.get("research_findings", [])
+    async def _call_on_step(self, payload: dict):
+        await self._on_step_async(payload)
+
+    async def _stream_text(self, agent_name: str, prompt: str, **kwargs) -> str:
+        """
+        Run the LLM, forwarding partial output to on_step as it streams.
+        Token events carry event="tokens" and the number of the step they
+        belong to; they don't advance the step counter.
+        """
+        if not self.on_step:
+            response = await self.llm.ainvoke(prompt, **kwargs)
+            return response.content
+
+        chunks, pending = [], []
+        async for chunk in self.llm.astream(prompt, **kwargs):
+            chunks.append(chunk.content)
+            pending.append(chunk.content)
+            if len(pending) >= STREAM_TOKEN_BATCH:
+                await self._call_on_step({
+                    "event": "tokens",
+                    "step": self.step_counter + 1,
+                    "agent": agent_name,
+                    "delta": "".join(pending),
+                })
+                pending.clear()
+        if pending:
+            await self._call_on_step({
+                "event": "tokens",
+                "step": self.step_counter + 1,
+                "agent": agent_name,
+                "delta": "".join(pending),
+            })
+        return "".join(chunks)
+
+    def _cache_kwargs(self, state: ResearchState) -> dict:
+        """Route a run's writer/critic calls to the same prompt-prefix cache."""
+        key = state.get("prompt_cache_key")
+        if key and self.use_prompt_cache_key:
+            return {"extra_body": {"prompt_cache_key": key}}
+        return {}
+
+    async def _supervisor_node(self, state: ResearchState) -> dict:
+        """
+        Supervisor decides the next step. The rules below cover every state
+        the graph can reach, so no LLM call is needed here.
+        """
+        p = state["params"]
+        start = time.perf_counter_ns()
         revision = state.get("revision_number", 0)
-        has_research = len(research) > 0
+        has_research = bool(state.get("research_findings"))
         has_draft = bool(state.get("draft", "").strip())
         critique = state.get("critique_notes", "")
-        max_rev = state.get("max_revisions", self.max_revisions)
-
-        decision = None
+        is_approved = is_approval(critique)
 
         # Deterministic decision logic (from notebook)
-        if "APPROVED" in critique.upper() and has_draft:
+        if is_approved and has_draft:
             decision = {"next_step": "END", "task_description": "Draft approved and complete"}
         elif not has_research:
             decision = {"next_step": "researcher", "task_description": f"Research the topic: {state.get('main_task', '')}"}
-        elif has_research and not has_draft:
+        elif not has_draft:
             decision = {"next_step": "writer", "task_description": "Write the first draft based on research findings"}
-        elif has_draft and not critique:
+        elif not critique:
             decision = {"next_step": "writer", "task_description": "Prepare draft for critique"}
-        elif critique and "APPROVED" not in critique.upper() and revision < max_rev:
+        elif revision < p.max_revisions:
             decision = {"next_step": "writer", "task_description": "Revise the draft based on critique feedback"}
-        elif revision >= max_rev:
+        else:
             decision = {"next_step": "END", "task_description": "Maximum revisions reached, finalizing"}
 
-        # LLM fallback
-        if not decision:
-            try:
-                research_text = "\n---\n".join(research) if research else "No research yet."
-                prompt = SUPERVISOR_PROMPT.format(
-                    main_task=state.get("main_task", ""),
-                    research_findings=research_text,
-                    draft=state.get("draft", "No draft yet."),
-                    critique_notes=critique or "No critique yet.",
-                    revision_number=revision,
-                    tone=state.get("tone", "professional"),
-                    target_audience=state.get("target_audience", "professionals"),
-                    word_count_min=state.get("word_count_min", 150),
-                    word_count_max=state.get("word_count_max", 300),
-                    language=state.get("language", "English"),
-                    max_revisions=max_rev,
-                )
-                response = self.llm.invoke(prompt)
-                text = response.content.strip()
-                if text.startswith("```"):
-                    lines = text.split("\n")
-                    text = "\n".join([l for l in lines if not l.strip().startswith("```")])
-                decision = json.loads(text.strip())
-            except Exception as e:
-                logger.warning(f"Supervisor LLM fallback error: {e}")
-                decision = {"next_step": "writer", "task_description": "Continue with draft creation"}
-
-        duration = int((time.time() - start) * 1000)
-        self._emit_step("supervisor", {
+        duration = (time.perf_counter_ns() - start) // 1_000_000
+        await self._emit_step("supervisor", {
             "decision": decision["next_step"],
             "task": decision["task_description"],
             "duration_ms": duration,
@@ -171,230 +389,288 @@ class LinkedInPostWorkflow:
             "current_sub_task": decision["task_description"],
         }
 
-    def _research_node(self, state: ResearchState) -> dict:
+    async def _research_node(self, state: ResearchState) -> dict:
         """Research node that gathers information via Tavily."""
-        start = time.time()
+        p = state["params"]
+        start = time.perf_counter_ns()
         sub_task = state.get("current_sub_task", state.get("main_task"))
         findings = f"Research on {sub_task} - general information gathered"
         sources = []
-
-        if self.tavily_tool:
+        # The summary also depends on these, so they scope the cache match
+        main_task = state.get("main_task") or sub_task
+        audience = p.target_audience
+
+        cached = await self.cache.aget_research(sub_task, main_task, audience) if self.cache else None
+        if cached:
+            findings, sources = cached["findings"], cached["sources"]
+        elif self.tavily_tool:
             try:
-                search_response = self.tavily_tool.invoke({"query": sub_task})
-                results = search_response if isinstance(search_response, list) else search_response.get("results", [])
+                # Search every angle concurrently - wall time is the slowest query, not the sum
+                queries = [sub_task, *(f"{main_task} {angle}" for angle in RESEARCH_ANGLES)]
+                responses = await asyncio.gather(
+                    *(self.tavily_tool.ainvoke({"query": q}) for q in queries),
+                    return_exceptions=True,
+                )
+                # TavilySearch reports transport failures as {"error": exc} instead of raising
+                responses = [
+                    r["error"] if isinstance(r, dict) and isinstance(r.get("error"), Exception) else r
+                    for r in responses
+                ]
+                if all(isinstance(r, TRANSIENT_ERRORS) for r in responses):
+                    raise responses[0]
 
                 formatted_results = []
-                for result in results[:3]:
-                    if isinstance(result, dict):
-                        title = result.get("title", "Untitled")
-                        url = result.get("url", "N/A")
-                        content = result.get("content", "")
-                        formatted_results.append(f"**{title}**\nSource: {url}\n{content[:300]}...")
-                        sources.append({"title": title, "url": url})
+                seen_urls = set()
+                encoder = await asyncio.to_thread(_encoder)
+                budget = RESEARCH_SNIPPET_BUDGET
+                for query, search_response in zip(queries, responses):
+                    if isinstance(search_response, Exception):
+                        logger.warning(f"Research query '{query}' failed: {search_response}")
+                        continue
+                    results = search_response if isinstance(search_response, list) else search_response.get("results", [])
+                    for result in results[:RESEARCH_RESULTS_PER_QUERY]:
+                        if isinstance(result, dict):
+                            title = result.get("title", "Untitled")
+                            url = result.get("url", "N/A")
+                            if url in seen_urls:
+                                continue
+                            seen_urls.add(url)
+                            if budget <= 0:
+                                break
+                            content, used = _truncate_tokens(
+                                result.get("content", ""), min(RESEARCH_RESULT_TOKENS, budget), encoder,
+                            )
+                            budget -= used
+                            formatted_results.append(f"**{title}**\nSource: {url}\n{content}")
+                            sources.append({"title": title, "url": url})
 
                 if formatted_results:
                     raw_output = "\n---\n".join(formatted_results)
-                    audience = state.get("target_audience", "professionals")
                     summary_prompt = (
                         f"Based on these search results about '{sub_task}' for an audience of {audience}, "
                         f"provide a concise summary of key findings (5-7 bullet points):\n{raw_output}\n"
                         f"Format as clear bullet points with the most important information."
                     )
-                    summary_response = self.llm.invoke(summary_prompt)
+                    summary_response = await self.llm.ainvoke(summary_prompt)
                     findings = summary_response.content
+                    if self.cache:
+                        await self.cache.aset_research(sub_task, main_task, audience, findings, sources)
+            except TRANSIENT_ERRORS:
+                raise  # retried by the task, resuming at this node
             except Exception as e:
                 logger.error(f"Research error: {e}")
                 findings = f"Research on {sub_task} - information gathered from web sources."
 
-        duration = int((time.time() - start) * 1000)
-        self._emit_step("researcher", {
+        duration = (time.perf_counter_ns() - start) // 1_000_000
+        await self._emit_step("researcher", {
             "query": sub_task,
             "findings_preview": findings[:200],
             "sources": sources,
+            "cached": bool(cached),
             "duration_ms": duration,
         })
 
-        return {"research_findings": [findings]}
+        return {
+            "research_findings": [findings],
+            "research_text": _cap_research([*state.get("research_findings", []), findings]),
+        }
 
-    def _write_node(self, state: ResearchState) -> dict:
+    async def _write_node(self, state: ResearchState) -> dict:
         """Writer node that creates or revises draft."""
-        start = time.time()
-        research = state.get("research_findings", [])
-        research_text = "\n\n".join(research) if research else "No research available."
+        p = state["params"]
+        start = time.perf_counter_ns()
+        research_text = state.get("research_text") or "No research available."
 
-        prompt = WRITER_PROMPT.format(
-            main_task=state.get("main_task", ""),
+        prompt = _writer_prompt(p, state.get("main_task", ""))(
             research_findings=research_text,
             draft=state.get("draft", ""),
             critique_notes=state.get("critique_notes", ""),
-            tone=state.get("tone", "professional"),
-            target_audience=state.get("target_audience", "professionals"),
-            word_count_min=state.get("word_count_min", 150),
-            word_count_max=state.get("word_count_max", 300),
-            language=state.get("language", "English"),
-            include_hashtags=state.get("include_hashtags", True),
-            include_cta=state.get("include_cta", True),
-            include_emoji=state.get("include_emoji", False),
-            template_instructions=state.get("template_instructions", ""),
         )
 
+        candidates = []
         try:
-            response = self.llm.invoke(prompt)
-            draft = response.content if response.content else "Draft in progress..."
+            if self.draft_candidates > 1 and not state.get("draft"):
+                # One request, n completions: the prompt tokens are paid once
+                result = await self.llm.agenerate(
+                    [[HumanMessage(content=prompt)]], n=self.draft_candidates, **self._cache_kwargs(state),
+                )
+                candidates = [g.text for g in result.generations[0] if g.text]
+                draft = candidates[0] if candidates else "Draft in progress..."
+            else:
+                draft = await self._stream_text("writer", prompt, **self._cache_kwargs(state))
+                draft = draft or "Draft in progress..."
+        except TRANSIENT_ERRORS:
+            raise
         except Exception as e:
             logger.error(f"Writer error: {e}")
             draft = "Error generating draft. Please try again."
 
-        duration = int((time.time() - start) * 1000)
+        duration = (time.perf_counter_ns() - start) // 1_000_000
         revision = state.get("revision_number", 0) + 1
-        self._emit_step("writer", {
+        words = word_count(draft)
+        await self._emit_step("writer", {
             "revision": revision,
-            "word_count": len(draft.split()),
+            "candidates": max(len(candidates), 1),
+            "word_count": words,
             "draft_preview": draft[:200],
             "duration_ms": duration,
         })
 
         return {
             "draft": draft,
+            "draft_candidates": candidates if len(candidates) > 1 else [],
             "revision_number": revision,
+            "word_count": words,
         }
 
-    def _critique_node(self, state: ResearchState) -> dict:
+    async def _rank_candidates(self, state: ResearchState, candidates: List[str]) -> Optional[dict]:
+        """Score all candidate drafts in one critic call; returns the best entry or None."""
+        p = state["params"]
+        prompt = _ranking_prompt(p, state.get("main_task", ""))(
+            candidates="\n\n".join(
+                f"Candidate {i}:\n{candidate}" for i, candidate in enumerate(candidates)
+            ),
+        )
+        try:
+            response = await self.llm.ainvoke(prompt)
+            ranking = [
+                r for r in _parse_json_reply(response.content)
+                if isinstance(r, dict) and isinstance(r.get("index"), int) and 0 <= r["index"] < len(candidates)
+            ]
+            return max(ranking, key=lambda r: float(r.get("score", 0))) if ranking else None
+        except Exception as e:
+            logger.warning(f"Candidate ranking error: {e}")
+            return None
+
+    async def _critique_node(self, state: ResearchState) -> dict:
         """Critique node that reviews the draft."""
-        start = time.time()
+        p = state["params"]
+        start = time.perf_counter_ns()
         draft = state.get("draft", "")
         revision_num = state.get("revision_number", 0)
-        max_rev = state.get("max_revisions", self.max_revisions)
+        max_rev = p.max_revisions
+
+        candidates = state.get("draft_candidates") or []
+        best = await self._rank_candidates(state, candidates) if len(candidates) > 1 else None
+        if best is not None:
+            draft = candidates[best["index"]]
 
         # Safety checks (from notebook)
-        if len(draft.strip()) < 100:
+        if best is not None:
+            # Only loop back to the writer when even the best candidate falls short
+            score = float(best.get("score", 0))
+            feedback = best.get("feedback") or ""
+            if score >= self.candidate_approval_score:
+                critique = f"APPROVED - Best of {len(candidates)} candidates (score {score:g}/10). {feedback}"
+            else:
+                critique = feedback or f"Best candidate scored {score:g}/10; strengthen the hook, value and structure."
+        elif len(draft.strip()) < 100:
             critique = "APPROVED - Draft is minimal but acceptable."
         elif revision_num >= max_rev:
             critique = "APPROVED - Maximum revisions reached. The post is satisfactory."
         else:
-            prompt = CRITIC_PROMPT.format(
-                main_task=state.get("main_task", ""),
-                draft=draft,
-                tone=state.get("tone", "professional"),
-                target_audience=state.get("target_audience", "professionals"),
-                word_count_min=state.get("word_count_min", 150),
-                word_count_max=state.get("word_count_max", 300),
-            )
+            prompt = _critic_prompt(p, state.get("main_task", ""))(draft=draft)
             try:
-                response = self.llm.invoke(prompt)
-                critique = response.content if response.content else "APPROVED"
+                critique = await self._stream_text("critic", prompt, **self._cache_kwargs(state))
+                critique = critique or "APPROVED"
+            except TRANSIENT_ERRORS:
+                raise
             except Exception as e:
                 logger.error(f"Critique error: {e}")
                 critique = "APPROVED - Error in critique, proceeding with current draft."
 
-        is_approved = "APPROVED" in critique.upper()
-        duration = int((time.time() - start) * 1000)
+        is_approved = is_approval(critique)
+        duration = (time.perf_counter_ns() - start) // 1_000_000
 
-        self._emit_step("critic", {
+        await self._emit_step("critic", {
             "approved": is_approved,
             "feedback_preview": critique[:200],
             "duration_ms": duration,
         })
 
+        update = {"draft": draft, "draft_candidates": [], "word_count": word_count(draft)} if best is not None else {}
         if is_approved:
-            return {"critique_notes": "APPROVED", "next_step": "END"}
+            return {**update, "critique_notes": "APPROVED", "next_step": "END"}
         else:
-            return {"critique_notes": critique, "next_step": "writer"}
-
-    def _build_graph(self) -> StateGraph:
-        """Build the LangGraph workflow - mirrors notebook exactly."""
-        workflow = StateGraph(ResearchState)
-
-        workflow.add_node("supervisor", self._supervisor_node)
-        workflow.add_node("researcher", self._research_node)
-        workflow.add_node("writer", self._write_node)
-        workflow.add_node("critiquer", self._critique_node)
-
-        workflow.set_entry_point("supervisor")
-
-        workflow.add_edge("researcher", "supervisor")
-        workflow.add_edge("writer", "critiquer")
-        workflow.add_edge("critiquer", "supervisor")
-
-        workflow.add_conditional_edges(
-            "supervisor",
-            lambda state: state.get("next_step", "researcher"),
-            {
-                "researcher": "researcher",
-                "writer": "writer",
-                "END": END,
-            },
-        )
+            return {**update, "critique_notes": critique, "next_step": "writer"}
 
-        return workflow.compile()
+    def _graph_config(self, thread_id: str = "") -> dict:
+        configurable = {WORKFLOW_CONFIG_KEY: self}
+        if thread_id:
+            configurable["thread_id"] = thread_id
+        return {"configurable": configurable}
 
-    def run(self, topic: str, **kwargs) -> dict:
-        """Execute the full workflow."""
-        self.step_counter = 0
-        initial_state = {
+    def _initial_state(self, topic: str, kwargs: dict) -> ResearchState:
+        """Fresh state for a run; shared by arun() and astream()."""
+        return {
+            **_EMPTY_STATE,
             "main_task": topic,
             "research_findings": [],
-            "draft": "",
-            "critique_notes": "",
-            "revision_number": 0,
-            "next_step": "",
-            "current_sub_task": "",
-            "tone": kwargs.get("tone", "professional"),
-            "target_audience": kwargs.get("target_audience", "tech professionals"),
-            "word_count_min": kwargs.get("word_count_min", 150),
-            "word_count_max": kwargs.get("word_count_max", 300),
-            "language": kwargs.get("language", "English"),
-            "include_hashtags": kwargs.get("include_hashtags", True),
-            "include_cta": kwargs.get("include_cta", True),
-            "include_emoji": kwargs.get("include_emoji", False),
-            "template_instructions": kwargs.get("template_instructions", ""),
-            "max_revisions": kwargs.get("max_revisions", self.max_revisions),
+            "draft_candidates": [],
+            "params": PostParams.from_kwargs(kwargs, self.max_revisions),
+            "prompt_cache_key": f"linkedin-post-{uuid.uuid4().hex}",
         }
 
-        result = self.app.invoke(initial_state)
-        return result
+    async def arun(self, topic: str, thread_id: str = "", **kwargs) -> dict:
+        """
+        Execute the full workflow. With a thread_id, progress is checkpointed
+        and a thread that stopped part way is resumed from its last node.
+        """
+        self.step_counter = 0
+        initial_state = self._initial_state(topic, kwargs)
 
-    def stream(self, topic: str, **kwargs):
+        if not thread_id:
+            return await _compiled_graph().ainvoke(initial_state, self._graph_config())
+
+        async with open_checkpointer() as checkpointer:
+            if checkpointer is None:
+                return await _compiled_graph().ainvoke(initial_state, self._graph_config())
+
+            app = _graph_builder().compile(checkpointer=checkpointer)
+            config = self._graph_config(thread_id)
+            snapshot = await app.aget_state(config)
+            if snapshot.next:
+                logger.info(f"Resuming workflow thread {thread_id} at {', '.join(snapshot.next)}")
+                return await app.ainvoke(None, config)
+            return await app.ainvoke(initial_state, config)
+
+    def run(self, topic: str, **kwargs) -> dict:
+        """Blocking wrapper around arun() for sync callers (Celery tasks, sync views)."""
+        return async_to_sync(self.arun)(topic, **kwargs)
+
+    async def astream(self, topic: str, **kwargs):
         """Stream the workflow execution step by step."""
         self.step_counter = 0
-        initial_state = {
-            "main_task": topic,
-            "research_findings": [],
-            "draft": "",
-            "critique_notes": "",
-            "revision_number": 0,
-            "next_step": "",
-            "current_sub_task": "",
-            "tone": kwargs.get("tone", "professional"),
-            "target_audience": kwargs.get("target_audience", "tech professionals"),
-            "word_count_min": kwargs.get("word_count_min", 150),
-            "word_count_max": kwargs.get("word_count_max", 300),
-            "language": kwargs.get("language", "English"),
-            "include_hashtags": kwargs.get("include_hashtags", True),
-            "include_cta": kwargs.get("include_cta", True),
-            "include_emoji": kwargs.get("include_emoji", False),
-            "template_instructions": kwargs.get("template_instructions", ""),
-            "max_revisions": kwargs.get("max_revisions", self.max_revisions),
-        }
+        initial_state = self._initial_state(topic, kwargs)
 
-        for step_output in self.app.stream(initial_state):
+        async for step_output in _compiled_graph().astream(initial_state, self._graph_config()):
             yield step_output
 
-    def evaluate_groundedness(self, draft: str, research_findings: List[str]) -> dict:
+    async def aevaluate_groundedness(self, draft: str, research_findings: List[str]) -> dict:
         """Evaluate groundedness of the final post - from notebook's evaluation cell."""
         research_text = "\n\n".join(research_findings)
-        prompt = GROUNDEDNESS_PROMPT.format(
+        eval_model = self._eval_llm_args[1]
+        if self.cache:
+            cached = await self.cache.aget_groundedness(eval_model, draft, research_text)
+            if cached is not None:
+                return cached
+
+        prompt = format_groundedness(
             research_findings=research_text,
             draft=draft,
         )
 
         try:
-            response = self.eval_llm.invoke(prompt)
-            content = response.content.strip()
-            if content.startswith("```"):
-                lines = content.split("\n")
-                content = "\n".join([l for l in lines if not l.strip().startswith("```")])
-            return json.loads(content.strip())
+            response = await self.eval_llm.ainvoke(prompt)
+            result = parse_groundedness(response.content)
         except Exception as e:
             logger.error(f"Groundedness evaluation error: {e}")
             return {"score": -1, "notes": f"Evaluation failed: {str(e)}"}
+
+        if self.cache:
+            await self.cache.aset_groundedness(eval_model, draft, research_text, result)
+        return result
+
+    def evaluate_groundedness(self, draft: str, research_findings: List[str]) -> dict:
+        """Blocking wrapper around aevaluate_groundedness()."""
+        return async_to_sync(self.aevaluate_groundedness)(draft, research_findings)
@@ -1,7 +1,7 @@
 from django.contrib import admin
 from .models import (
     APIConfiguration, PostTemplate, PostProject, AgentRun, AgentStep,
-    ResearchFinding, PostDraft, PostAnalytics, SavedHashtag, ContentCalendar,
+    ResearchFinding, ResearchCache, PostDraft, PostAnalytics, SavedHashtag, ContentCalendar,
 )
 
 admin.site.site_header = "LinkedIn Post Agent Admin"
@@ -9,6 +9,7 @@ admin.site.site_header = "LinkedIn Post Agent Admin"
 @admin.register(APIConfiguration)
 class APIConfigurationAdmin(admin.ModelAdmin):
     list_display = ["user", "openai_model", "updated_at"]
+    list_select_related = ["user"]
 
 @admin.register(PostTemplate)
 class PostTemplateAdmin(admin.ModelAdmin):
@@ -20,34 +21,53 @@ class PostProjectAdmin(admin.ModelAdmin):
     list_display = ["title", "user", "status", "tone", "groundedness_score", "created_at"]
     list_filter = ["status", "tone"]
     search_fields = ["title", "topic"]
+    list_select_related = ["user"]
+    list_per_page = 50
 
 @admin.register(AgentRun)
 class AgentRunAdmin(admin.ModelAdmin):
     list_display = ["id", "project", "status", "total_revisions", "created_at"]
+    list_select_related = ["project"]
+    list_per_page = 50
     list_filter = ["status"]
 
 @admin.register(AgentStep)
 class AgentStepAdmin(admin.ModelAdmin):
     list_display = ["agent_name", "step_number", "decision", "duration_ms", "created_at"]
+    list_per_page = 50
     list_filter = ["agent_name"]
 
 @admin.register(ResearchFinding)
 class ResearchFindingAdmin(admin.ModelAdmin):
     list_display = ["project", "query", "created_at"]
+    list_select_related = ["project"]
+    list_per_page = 50
+
+@admin.register(ResearchCache)
+class ResearchCacheAdmin(admin.ModelAdmin):
+    list_display = ["user", "query", "created_at"]
+    list_select_related = ["user"]
+    list_per_page = 50
+    exclude = ["embedding"]
 
 @admin.register(PostDraft)
 class PostDraftAdmin(admin.ModelAdmin):
     list_display = ["project", "version", "word_count", "is_approved", "created_at"]
+    list_select_related = ["project"]
+    list_per_page = 50
 
 @admin.register(PostAnalytics)
 class PostAnalyticsAdmin(admin.ModelAdmin):
     list_display = ["project", "impressions", "likes", "comments", "shares", "recorded_at"]
+    list_select_related = ["project"]
 
 @admin.register(SavedHashtag)
 class SavedHashtagAdmin(admin.ModelAdmin):
     list_display = ["user", "tag", "category", "usage_count"]
+    list_select_related = ["user"]
 
 @admin.register(ContentCalendar)
 class ContentCalendarAdmin(admin.ModelAdmin):
     list_display = ["title", "user", "scheduled_date", "is_completed"]
+    list_select_related = ["user"]
     list_filter = ["is_completed"]
@@ -2,6 +2,8 @@ import uuid
 from django.db import models
 from django.contrib.auth.models import User
 
+from linkedin_agent.utils import word_count
+
 
 class APIConfiguration(models.Model):
     """Per-user API key configuration."""
@@ -56,6 +58,12 @@ class PostTemplate(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        constraints = [
+            # Lets seed_data insert system templates with ignore_conflicts
+            models.UniqueConstraint(
+                fields=["name"], condition=models.Q(is_system=True), name="unique_system_template_name",
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -65,6 +73,7 @@ class PostProject(models.Model):
     """A LinkedIn post generation project / session."""
     STATUS_CHOICES = [
         ("draft", "Draft"),
+        ("queued", "Queued"),
         ("researching", "Researching"),
         ("writing", "Writing"),
         ("reviewing", "Reviewing"),
@@ -77,9 +86,9 @@ class PostProject(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="projects")
     title = models.CharField(max_length=500)
     topic = models.TextField(help_text="The main topic/prompt for LinkedIn post generation")
-    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="draft", db_index=True)
     template = models.ForeignKey(PostTemplate, on_delete=models.SET_NULL, null=True, blank=True)
-    tone = models.CharField(max_length=50, default="professional")
+    tone = models.CharField(max_length=50, default="professional", db_index=True)
     target_audience = models.CharField(max_length=200, blank=True, default="")
     target_word_count_min = models.IntegerField(default=150)
     target_word_count_max = models.IntegerField(default=300)
@@ -92,6 +101,10 @@ class PostProject(models.Model):
     final_post = models.TextField(blank=True, default="")
     groundedness_score = models.FloatField(null=True, blank=True)
     groundedness_report = models.JSONField(null=True, blank=True)
+    # OpenAI Batch API job evaluating this post, while one is pending
+    groundedness_batch_id = models.CharField(max_length=100, blank=True, default="")
+    # Sum of total_revisions over this project's runs, kept here for the dashboard
+    revision_count = models.PositiveIntegerField(default=0)
 
     # Scheduling
     scheduled_at = models.DateTimeField(null=True, blank=True)
@@ -100,11 +113,12 @@ class PostProject(models.Model):
     # Metadata
     is_favorite = models.BooleanField(default=False)
     tags = models.JSONField(default=list, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "-created_at"])]
 
     def __str__(self):
         return f"{self.title} ({self.status})"
@@ -144,8 +158,8 @@ class AgentStep(models.Model):
 
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     run = models.ForeignKey(AgentRun, on_delete=models.CASCADE, related_name="steps")
-    agent_name = models.CharField(max_length=50, choices=AGENT_CHOICES)
-    step_number = models.IntegerField()
+    agent_name = models.CharField(max_length=50, choices=AGENT_CHOICES, db_index=True)
+    step_number = models.IntegerField(db_index=True)
     input_data = models.JSONField(default=dict, blank=True)
     output_data = models.JSONField(default=dict, blank=True)
     decision = models.CharField(max_length=200, blank=True, default="")
@@ -155,6 +169,7 @@ class AgentStep(models.Model):
 
     class Meta:
         ordering = ["step_number"]
+        indexes = [models.Index(fields=["run", "step_number"])]
 
 
 class ResearchFinding(models.Model):
@@ -166,10 +181,29 @@ class ResearchFinding(models.Model):
     summary = models.TextField()
     sources = models.JSONField(default=list, blank=True)
     raw_results = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["project", "-created_at"])]
+
+
+class ResearchCache(models.Model):
+    """Past research summaries, reused for new queries with a similar embedding."""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="research_cache")
+    query = models.TextField()
+    # Digest of what the summary was written for besides the query (parent task, audience);
+    # only entries with the same context are candidates for a match
+    context = models.CharField(max_length=32, blank=True, default="")
+    embedding = models.JSONField(default=list)
+    findings = models.TextField()
+    sources = models.JSONField(default=list, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "context", "-created_at"])]
 
 
 class PostDraft(models.Model):
@@ -177,7 +211,7 @@ class PostDraft(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     project = models.ForeignKey(PostProject, on_delete=models.CASCADE, related_name="drafts")
     run = models.ForeignKey(AgentRun, on_delete=models.CASCADE, related_name="drafts")
-    version = models.IntegerField()
+    version = models.IntegerField(db_index=True)
     content = models.TextField()
     word_count = models.IntegerField(default=0)
     critique_notes = models.TextField(blank=True, default="")
@@ -186,9 +220,12 @@ class PostDraft(models.Model):
 
     class Meta:
         ordering = ["version"]
+        indexes = [models.Index(fields=["project", "version"])]
 
     def save(self, *args, **kwargs):
-        self.word_count = len(self.content.split())
+        # The workflow already counted the words of a freshly generated draft
+        if not (self._state.adding and self.word_count):
+            self.word_count = word_count(self.content)
         super().save(*args, **kwargs)
 
 
@@ -213,7 +250,7 @@ class SavedHashtag(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="hashtags")
     tag = models.CharField(max_length=100)
     category = models.CharField(max_length=100, blank=True, default="")
-    usage_count = models.IntegerField(default=0)
+    usage_count = models.IntegerField(default=0, db_index=True)
 
     class Meta:
         unique_together = ("user", "tag")
@@ -235,7 +272,7 @@ class ContentCalendar(models.Model):
     project = models.ForeignKey(PostProject, on_delete=models.SET_NULL, null=True, blank=True)
     title = models.CharField(max_length=300)
     description = models.TextField(blank=True, default="")
-    scheduled_date = models.DateField()
+    scheduled_date = models.DateField(db_index=True)
     scheduled_time = models.TimeField(null=True, blank=True)
     recurrence = models.CharField(max_length=20, choices=RECURRENCE_CHOICES, default="none")
     is_completed = models.BooleanField(default=False)
@@ -0,0 +1,29 @@
+"""Pagination classes for the REST API."""
+
+from django.core.paginator import Paginator
+from rest_framework.pagination import PageNumberPagination
+
+
+class FirstPageCountPaginator(Paginator):
+    """
+    Serves page 1 from a single LIMIT query. When that query returns no
+    more than one page, its length is the total and no COUNT(*) runs;
+    otherwise the rows are still reused as the page and only the count is
+    queried. Other pages behave as usual.
+    """
+
+    def page(self, number):
+        if number not in (1, "1") or "count" in self.__dict__:
+            return super().page(number)
+
+        last_page_size = self.per_page + self.orphans
+        rows = list(self.object_list[:last_page_size + 1])
+        if len(rows) <= last_page_size:
+            self.__dict__["count"] = len(rows)  # prime the cached_property
+            return self._get_page(rows, 1, self)
+        self.validate_number(1)
+        return self._get_page(rows[:self.per_page], 1, self)
+
+
+class ProjectPagination(PageNumberPagination):
+    django_paginator_class = FirstPageCountPaginator
@@ -0,0 +1,53 @@
+"""
+orjson-backed JSON renderer and parser for DRF.
+Output matches rest_framework's JSONRenderer for the types our serializers
+produce; without orjson both classes defer to the stock implementations.
+"""
+
+import datetime
+from decimal import Decimal
+
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from linkedin_agent.utils import orjson
+
+if orjson is not None:
+    # OPT_UTC_Z renders UTC datetimes with a "Z" suffix, as DRF's encoder does
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+def _default(obj):
+    """The cases of DRF's JSONEncoder that orjson doesn't handle natively."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, datetime.timedelta):
+        return str(obj.total_seconds())
+    if isinstance(obj, Promise):  # lazy translation strings
+        return str(obj)
+    if isinstance(obj, bytes):
+        return obj.decode()
+    if hasattr(obj, "__iter__"):  # querysets, generators
+        return tuple(obj)
+    raise TypeError
+
+
+class ORJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        if data is None:
+            return b""
+        return orjson.dumps(data, default=_default, option=_OPTIONS)
+
+
+class ORJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
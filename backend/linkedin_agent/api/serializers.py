@@ -5,6 +5,8 @@ from .models import (
     ResearchFinding, PostDraft, PostAnalytics, SavedHashtag, ContentCalendar,
 )
 
+BULK_GENERATE_MAX = 20
+
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -65,19 +67,42 @@ class PostTemplateSerializer(serializers.ModelSerializer):
 class AgentStepSerializer(serializers.ModelSerializer):
     class Meta:
         model = AgentStep
-        fields = "__all__"
+        fields = (
+            "id", "run", "agent_name", "step_number", "input_data", "output_data",
+            "decision", "duration_ms", "tokens_used", "created_at",
+        )
 
 
 class ResearchFindingSerializer(serializers.ModelSerializer):
+    # raw_results (the full Tavily payload) stays server-side
     class Meta:
         model = ResearchFinding
-        fields = "__all__"
+        fields = ("id", "project", "run", "query", "summary", "sources", "created_at")
 
 
 class PostDraftSerializer(serializers.ModelSerializer):
     class Meta:
         model = PostDraft
-        fields = "__all__"
+        fields = (
+            "id", "project", "run", "version", "content", "word_count",
+            "critique_notes", "is_approved", "created_at",
+        )
+
+
+class PostDraftListSerializer(serializers.ModelSerializer):
+    """Expects drafts annotated with `preview` (see views.DRAFT_PREVIEW)."""
+    preview = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = PostDraft
+        fields = ("id", "version", "word_count", "is_approved", "created_at", "preview")
+
+
+AGENT_RUN_FIELDS = (
+    "id", "project", "status", "started_at", "completed_at",
+    "total_revisions", "error_message", "created_at",
+    "steps", "findings", "drafts",
+)
 
 
 class AgentRunSerializer(serializers.ModelSerializer):
@@ -87,31 +112,30 @@ class AgentRunSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = AgentRun
-        fields = "__all__"
+        fields = AGENT_RUN_FIELDS
+
+
+class AgentRunListSerializer(AgentRunSerializer):
+    drafts = PostDraftListSerializer(many=True, read_only=True)
+
+    class Meta(AgentRunSerializer.Meta):
+        pass
 
 
 class PostProjectListSerializer(serializers.ModelSerializer):
-    draft_count = serializers.SerializerMethodField()
-    latest_draft_preview = serializers.SerializerMethodField()
+    """Expects a queryset annotated by views.with_draft_summary."""
+    draft_count = serializers.IntegerField(read_only=True)
+    latest_draft_preview = serializers.CharField(source="latest_preview", read_only=True)
 
     class Meta:
         model = PostProject
         fields = [
             "id", "title", "topic", "status", "tone", "target_audience",
-            "is_favorite", "tags", "final_post", "groundedness_score",
+            "is_favorite", "tags", "groundedness_score",
             "scheduled_at", "published_at", "created_at", "updated_at",
             "draft_count", "latest_draft_preview",
         ]
 
-    def get_draft_count(self, obj):
-        return obj.drafts.count()
-
-    def get_latest_draft_preview(self, obj):
-        draft = obj.drafts.order_by("-version").first()
-        if draft:
-            return draft.content[:200]
-        return ""
-
 
 class PostProjectDetailSerializer(serializers.ModelSerializer):
     runs = AgentRunSerializer(many=True, read_only=True)
@@ -143,14 +167,17 @@ class PostProjectCreateSerializer(serializers.ModelSerializer):
 class PostAnalyticsSerializer(serializers.ModelSerializer):
     class Meta:
         model = PostAnalytics
-        fields = "__all__"
+        fields = (
+            "id", "project", "impressions", "likes", "comments", "shares",
+            "clicks", "engagement_rate", "recorded_at",
+        )
         read_only_fields = ["id", "recorded_at"]
 
 
 class SavedHashtagSerializer(serializers.ModelSerializer):
     class Meta:
         model = SavedHashtag
-        fields = "__all__"
+        fields = ("id", "user", "tag", "category", "usage_count")
         read_only_fields = ["user", "usage_count"]
 
 
@@ -159,7 +186,11 @@ class ContentCalendarSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = ContentCalendar
-        fields = "__all__"
+        fields = (
+            "id", "user", "project", "project_title", "title", "description",
+            "scheduled_date", "scheduled_time", "recurrence", "is_completed",
+            "color", "created_at",
+        )
         read_only_fields = ["id", "user", "created_at"]
 
     def create(self, validated_data):
@@ -172,6 +203,13 @@ class GeneratePostSerializer(serializers.Serializer):
     project_id = serializers.UUIDField()
 
 
+class BulkGenerateSerializer(serializers.Serializer):
+    """Input for starting generation on several projects at once."""
+    project_ids = serializers.ListField(
+        child=serializers.UUIDField(), allow_empty=False, max_length=BULK_GENERATE_MAX,
+    )
+
+
 class RegeneratePostSerializer(serializers.Serializer):
     """Input for regenerating with feedback."""
     project_id = serializers.UUIDField()
@@ -0,0 +1,95 @@
+"""
+Cache invalidation hooks.
+The dashboard stats, API configuration responses and agent credentials
+(services.config) are cached per user; any write to the rows they are
+computed from drops that user's entry.
+Template lists are cached per user too, tagged with a shared version that
+is bumped whenever a system template changes.
+"""
+
+import logging
+import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from linkedin_agent.services.config import llm_config_cache_key
+
+from .models import AgentRun, APIConfiguration, PostDraft, PostProject, PostTemplate
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CACHE_TTL = 300
+API_CONFIG_CACHE_TTL = 300
+TEMPLATE_LIST_CACHE_TTL = 3600
+SYSTEM_TEMPLATES_VERSION_KEY = "templates:system_version"
+
+
+def dashboard_cache_key(user_id: int) -> str:
+    return f"dashboard:{user_id}"
+
+
+def api_config_cache_key(user_id: int) -> str:
+    return f"api_config:{user_id}"
+
+
+def template_list_cache_key(user_id: int) -> str:
+    return f"templates:{user_id}"
+
+
+def _delete(key: str):
+    try:
+        cache.delete(key)
+    except Exception as e:
+        # A cache outage must not fail the write that triggered this
+        logger.warning(f"Cache invalidation of {key} failed: {e}")
+
+
+def invalidate_dashboard(user_id: int):
+    """Drop the cached dashboard; call after queryset .update()s that bypass signals."""
+    _delete(dashboard_cache_key(user_id))
+
+
+def invalidate_system_templates() -> str:
+    """Start a new system template version, orphaning every user's cached list; returns it."""
+    version = str(time.time_ns())
+    try:
+        cache.set(SYSTEM_TEMPLATES_VERSION_KEY, version, None)
+    except Exception as e:
+        logger.warning(f"Cache invalidation of {SYSTEM_TEMPLATES_VERSION_KEY} failed: {e}")
+    return version
+
+
+@receiver([post_save, post_delete], sender=PostProject)
+def _project_changed(sender, instance, **kwargs):
+    invalidate_dashboard(instance.user_id)
+
+
+# Saves only: children are deleted through their project, whose post_delete
+# already drops the entry, and a post_delete receiver here would also turn
+# those cascades into per-row deletes
+@receiver(post_save, sender=AgentRun)
+@receiver(post_save, sender=PostDraft)
+def _project_child_changed(sender, instance, **kwargs):
+    if sender.project.is_cached(instance):
+        user_id = instance.project.user_id
+    else:
+        # Just the owner's id - loading the whole project row per child save is wasted work
+        user_id = PostProject.objects.filter(pk=instance.project_id).values_list("user_id", flat=True).first()
+    if user_id is not None:
+        invalidate_dashboard(user_id)
+
+
+@receiver([post_save, post_delete], sender=APIConfiguration)
+def _api_config_changed(sender, instance, **kwargs):
+    _delete(api_config_cache_key(instance.user_id))
+    _delete(llm_config_cache_key(instance.user_id))
+
+
+@receiver([post_save, post_delete], sender=PostTemplate)
+def _template_changed(sender, instance, **kwargs):
+    if instance.is_system:
+        invalidate_system_templates()
+    if instance.user_id:
+        _delete(template_list_cache_key(instance.user_id))
@@ -1,27 +1,56 @@
 """Celery tasks for async agent execution."""
 
-from celery import shared_task
+from celery import Task, shared_task
+from linkedin_agent.agents.checkpoint import delete_checkpoints
+from linkedin_agent.agents.clients import TRANSIENT_ERRORS
 from linkedin_agent.services.orchestrator import run_post_generation
 
 
-@shared_task(bind=True, max_retries=1, time_limit=600)
+class CheckpointedTask(Task):
+    """Task whose id is a workflow thread; drops the thread's checkpoints once it has failed for good."""
+
+    def on_failure(self, exc, task_id, args, kwargs, einfo):
+        # Not called for retries, which still need the checkpoints to resume
+        delete_checkpoints(task_id)
+
+
+@shared_task(
+    base=CheckpointedTask, bind=True, max_retries=1, time_limit=600,
+    autoretry_for=TRANSIENT_ERRORS, retry_backoff=10, retry_backoff_max=30,
+    # Acknowledged only once finished: a task lost with its worker is redelivered
+    # under the same id and resumes from the checkpointed thread
+    acks_late=True, reject_on_worker_lost=True,
+)
 def generate_post_task(self, project_id: str, user_id: int):
     """Async task to run the multi-agent post generation workflow."""
-    try:
-        result = run_post_generation(project_id, user_id)
-        return result
-    except Exception as exc:
-        raise self.retry(exc=exc, countdown=10)
+    # Retries keep the task id, so they pick up the checkpointed run
+    return run_post_generation(project_id, user_id, thread_id=self.request.id or "")
+
+
+@shared_task
+def persist_agent_steps_task(run_id: str, steps: list):
+    """Bulk-insert the agent steps buffered during a workflow run."""
+    from linkedin_agent.api.models import AgentStep
+
+    AgentStep.objects.bulk_create(
+        [AgentStep(run_id=run_id, **step) for step in steps],
+        batch_size=50,
+    )
+    return len(steps)
 
 
 @shared_task(bind=True, max_retries=1, time_limit=300)
 def evaluate_post_task(self, project_id: str, user_id: int):
     """Async task to evaluate groundedness of a post."""
-    from linkedin_agent.api.models import PostProject, APIConfiguration
+    from linkedin_agent.api.models import PostProject, ResearchFinding
     from linkedin_agent.agents.workflow import LinkedInPostWorkflow
+    from linkedin_agent.services.config import get_llm_config
 
-    project = PostProject.objects.get(id=project_id)
-    config = APIConfiguration.objects.get(user_id=user_id)
+    project = PostProject.objects.only("id", "user", "final_post").get(id=project_id)
+    findings = list(ResearchFinding.objects.filter(project_id=project_id).values_list("summary", flat=True))
+    config = get_llm_config(user_id)
+    if config is None:
+        raise ValueError("API configuration not found.")
 
     workflow = LinkedInPostWorkflow(
         openai_api_key=config.openai_api_key,
@@ -31,7 +60,6 @@ def evaluate_post_task(self, project_id: str, user_id: int):
         tavily_api_key=config.tavily_api_key,
     )
 
-    findings = list(project.findings.values_list("summary", flat=True))
     result = workflow.evaluate_groundedness(
         draft=project.final_post,
         research_findings=findings,
@@ -42,3 +70,41 @@ def evaluate_post_task(self, project_id: str, user_id: int):
     project.save(update_fields=["groundedness_score", "groundedness_report"])
 
     return result
+
+
+@shared_task(time_limit=600)
+def mcp_generate_post_task(args: dict, user_id: int):
+    """MCP generate_linkedin_post, run off the request thread."""
+    from linkedin_agent.mcp.views import run_generate_post
+    from linkedin_agent.services.config import get_llm_config
+
+    config = get_llm_config(user_id)
+    if config is None:
+        raise ValueError("API configuration not found.")
+    return run_generate_post(args, config)
+
+
+@shared_task(time_limit=300)
+def mcp_evaluate_post_task(args: dict, user_id: int):
+    """MCP evaluate_post_groundedness, run off the request thread."""
+    from linkedin_agent.mcp.views import run_evaluate
+    from linkedin_agent.services.config import get_llm_config
+
+    config = get_llm_config(user_id)
+    if config is None:
+        raise ValueError("API configuration not found.")
+    return run_evaluate(args, config)
+
+
+@shared_task
+def submit_groundedness_batches_task():
+    """Periodic: send pending calendar posts to the OpenAI Batch API for evaluation."""
+    from linkedin_agent.services.batch_eval import submit_calendar_batches
+    return submit_calendar_batches()
+
+
+@shared_task
+def collect_groundedness_batches_task():
+    """Periodic: store results of finished groundedness batches."""
+    from linkedin_agent.services.batch_eval import collect_groundedness_batches
+    return collect_groundedness_batches()
@@ -1,28 +1,63 @@
 """REST API views for the LinkedIn Post Agent."""
 
+import hashlib
+import logging
 from datetime import timedelta
 from django.utils import timezone
 from django.contrib.auth.models import User
-from django.db.models import Avg, Sum, Count, Q
-
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import Http404
+from django.db.models import Avg, Sum, Count, F, Q, OuterRef, Prefetch, Subquery, Value
+from django.db.models.functions import Coalesce, Concat, Left, Now
+
+from celery import group
 from rest_framework import viewsets, status, generics, permissions
 from rest_framework.decorators import api_view, permission_classes, action
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from linkedin_agent.utils import etag_matches, json_dumps
+
 from .models import (
-    APIConfiguration, PostTemplate, PostProject, AgentRun,
-    PostAnalytics, SavedHashtag, ContentCalendar,
+    APIConfiguration, PostTemplate, PostProject, AgentRun, PostDraft,
+    ResearchFinding, PostAnalytics, SavedHashtag, ContentCalendar,
 )
+from .pagination import ProjectPagination
 from .serializers import (
     UserSerializer, RegisterSerializer, APIConfigurationSerializer,
     PostTemplateSerializer, PostProjectListSerializer, PostProjectDetailSerializer,
-    PostProjectCreateSerializer, AgentRunSerializer, PostAnalyticsSerializer,
+    PostProjectCreateSerializer, AgentRunSerializer, AgentRunListSerializer, PostAnalyticsSerializer,
     SavedHashtagSerializer, ContentCalendarSerializer, DashboardStatsSerializer,
+    BulkGenerateSerializer,
+)
+from .signals import (
+    API_CONFIG_CACHE_TTL, DASHBOARD_CACHE_TTL, SYSTEM_TEMPLATES_VERSION_KEY, TEMPLATE_LIST_CACHE_TTL,
+    api_config_cache_key, dashboard_cache_key, invalidate_dashboard, invalidate_system_templates,
+    template_list_cache_key,
 )
 from .tasks import generate_post_task, evaluate_post_task
 
+logger = logging.getLogger(__name__)
+
+
+# Response caches are an optimisation: a cache outage serves uncached responses
+def _cache_get(key: str):
+    try:
+        return cache.get(key)
+    except Exception as e:
+        logger.warning(f"Cache lookup of {key} failed: {e}")
+        return None
+
+
+def _cache_set(key: str, value, timeout: int):
+    try:
+        cache.set(key, value, timeout)
+    except Exception as e:
+        logger.warning(f"Cache store of {key} failed: {e}")
+
 
 # --- Auth ---
 
@@ -56,9 +91,22 @@ def me_view(request):
 class APIConfigView(generics.RetrieveUpdateAPIView):
     serializer_class = APIConfigurationSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        # Read-only: a user without a row sees the defaults; it is created on first write
+        key = api_config_cache_key(request.user.id)
+        data = _cache_get(key)
+        if data is None:
+            config = APIConfiguration.objects.filter(user=request.user).first() or APIConfiguration(user=request.user)
+            data = self.get_serializer(config).data
+            _cache_set(key, data, API_CONFIG_CACHE_TTL)
+        return Response(data)
+
     def get_object(self):
-        obj, _ = APIConfiguration.objects.get_or_create(user=self.request.user)
-        return obj
+        # Registration creates the row, so the create branch is only for older accounts
+        try:
+            return APIConfiguration.objects.get(user=self.request.user)
+        except APIConfiguration.DoesNotExist:
+            return APIConfiguration.objects.create(user=self.request.user)
 
 
 # --- Templates ---
@@ -71,19 +119,83 @@ class PostTemplateViewSet(viewsets.ModelViewSet):
             Q(is_system=True) | Q(user=self.request.user)
         )
 
+    def list(self, request, *args, **kwargs):
+        # Only the plain listing the template picker asks for is cached
+        if request.query_params:
+            return super().list(request, *args, **kwargs)
+
+        key = template_list_cache_key(request.user.id)
+        try:
+            cached = cache.get_many([SYSTEM_TEMPLATES_VERSION_KEY, key])
+        except Exception as e:
+            logger.warning(f"Cache lookup of {key} failed: {e}")
+            return super().list(request, *args, **kwargs)
+        version = cached.get(SYSTEM_TEMPLATES_VERSION_KEY) or invalidate_system_templates()
+        entry = cached.get(key)
+        if entry is not None and entry[0] == version:
+            return Response(entry[1])
+
+        response = super().list(request, *args, **kwargs)
+        _cache_set(key, (version, response.data), TEMPLATE_LIST_CACHE_TTL)
+        return response
+
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
 
 # --- Projects ---
 
+# "queued" is the claim a dispatch takes on a project; the worker moves it on to "researching"
+IN_PROGRESS_STATUSES = ("queued", "researching", "writing", "reviewing")
+
+# Columns PostProjectListSerializer renders; list pages skip the large text/JSON fields
+PROJECT_LIST_COLUMNS = (
+    "id", "title", "topic", "status", "tone", "target_audience",
+    "is_favorite", "tags", "groundedness_score",
+    "scheduled_at", "published_at", "created_at", "updated_at",
+)
+
+# Short draft excerpt computed in SQL, so list responses never load full drafts
+DRAFT_PREVIEW = Left("content", 200)
+
+
+def findings_without_raw():
+    """ResearchFindingSerializer doesn't render raw_results; don't fetch it."""
+    return ResearchFinding.objects.defer("raw_results")
+
+
+def with_draft_summary(projects):
+    """Annotate draft_count and latest_preview for PostProjectListSerializer in the same query."""
+    latest = PostDraft.objects.filter(project=OuterRef("pk")).order_by("-version")
+    return projects.annotate(
+        draft_count=Count("drafts"),
+        latest_preview=Coalesce(Subquery(latest.annotate(preview=DRAFT_PREVIEW).values("preview")[:1]), Value("")),
+    ).order_by(*PostProject._meta.ordering)  # Meta.ordering is dropped from GROUP BY queries
+
+
 class PostProjectViewSet(viewsets.ModelViewSet):
+    pagination_class = ProjectPagination
     filterset_fields = ["status", "tone", "is_favorite"]
     search_fields = ["title", "topic", "tags"]
     ordering_fields = ["created_at", "updated_at", "groundedness_score"]
 
     def get_queryset(self):
-        return PostProject.objects.filter(user=self.request.user)
+        projects = PostProject.objects.filter(user=self.request.user)
+        if self.action == "list":
+            return with_draft_summary(projects.only(*PROJECT_LIST_COLUMNS))
+        if self.action in ("update", "partial_update"):
+            # These respond with PostProjectListSerializer
+            return with_draft_summary(projects)
+        if self.action == "retrieve":
+            # Everything PostProjectDetailSerializer nests, in one query per relation
+            return projects.select_related("template").prefetch_related(
+                "drafts",
+                Prefetch("findings", queryset=findings_without_raw()),
+                Prefetch("runs", queryset=AgentRun.objects.prefetch_related(
+                    "steps", Prefetch("findings", queryset=findings_without_raw()), "drafts",
+                )),
+            )
+        return projects
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -95,39 +207,82 @@ class PostProjectViewSet(viewsets.ModelViewSet):
     @action(detail=True, methods=["post"])
     def generate(self, request, pk=None):
         """Trigger the multi-agent workflow for this project."""
-        project = self.get_object()
-        if project.status in ("researching", "writing", "reviewing"):
+        # Claim the project with one conditional UPDATE; only a miss needs a second look
+        try:
+            started = PostProject.objects.filter(pk=pk, user=request.user).exclude(
+                status__in=IN_PROGRESS_STATUSES,
+            ).update(status="queued")
+        except (ValueError, ValidationError):  # malformed UUID
+            raise Http404
+        if not started:
+            self.get_object()  # 404 if it isn't the user's project
             return Response(
                 {"error": "A generation is already in progress."},
                 status=status.HTTP_409_CONFLICT,
             )
+        invalidate_dashboard(request.user.id)
 
-        project.status = "draft"
-        project.save(update_fields=["status"])
-
-        task = generate_post_task.delay(str(project.id), request.user.id)
+        try:
+            task = generate_post_task.delay(str(pk), request.user.id)
+        except Exception:
+            self._release_claim([pk])
+            raise
         return Response({
             "message": "Post generation started",
             "task_id": task.id,
-            "project_id": str(project.id),
+            "project_id": str(pk),
+        })
+
+    @action(detail=False, methods=["post"])
+    def bulk_generate(self, request):
+        """Trigger the workflow for several projects, dispatched to the broker as one group."""
+        serializer = BulkGenerateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        # Claim the rows like generate does. The locked SELECT makes a concurrent
+        # bulk or single generate wait, then skip the projects claimed here.
+        with transaction.atomic():
+            claimable = self.get_queryset().filter(
+                id__in=serializer.validated_data["project_ids"],
+            ).exclude(status__in=IN_PROGRESS_STATUSES)
+            project_ids = [str(pk) for pk in claimable.select_for_update().values_list("id", flat=True)]
+            if project_ids:
+                PostProject.objects.filter(id__in=project_ids).update(status="queued")
+        if not project_ids:
+            return Response(
+                {"error": "No matching projects to generate."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        invalidate_dashboard(request.user.id)
+
+        # One producer / broker connection for the whole batch instead of one per delay()
+        try:
+            result = group(generate_post_task.s(pid, request.user.id) for pid in project_ids).apply_async()
+        except Exception:
+            self._release_claim(project_ids)
+            raise
+        return Response({
+            "message": f"Post generation started for {len(project_ids)} projects",
+            "tasks": {pid: task.id for pid, task in zip(project_ids, result.results)},
         })
 
     @action(detail=True, methods=["post"])
     def regenerate(self, request, pk=None):
         """Regenerate with optional user feedback."""
-        project = self.get_object()
+        values = {
+            "status": "queued", "final_post": "",
+            "groundedness_score": None, "groundedness_report": None, "groundedness_batch_id": "",
+        }
         feedback = request.data.get("feedback", "")
         if feedback:
-            project.topic = f"{project.topic}\n\nAdditional instructions: {feedback}"
-            project.save(update_fields=["topic"])
-
-        project.status = "draft"
-        project.final_post = ""
-        project.groundedness_score = None
-        project.groundedness_report = None
-        project.save()
-
-        task = generate_post_task.delay(str(project.id), request.user.id)
+            values["topic"] = Concat("topic", Value(f"\n\nAdditional instructions: {feedback}"))
+        self._update_own(pk, **values)
+
+        try:
+            task = generate_post_task.delay(str(pk), request.user.id)
+        except Exception:
+            self._release_claim([pk])
+            raise
         return Response({
             "message": "Regeneration started",
             "task_id": task.id,
@@ -148,39 +303,64 @@ class PostProjectViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=["post"])
     def toggle_favorite(self, request, pk=None):
-        project = self.get_object()
-        project.is_favorite = not project.is_favorite
-        project.save(update_fields=["is_favorite"])
-        return Response({"is_favorite": project.is_favorite})
+        # Flip in SQL: no read-modify-write race between concurrent toggles
+        self._update_own(pk, is_favorite=~F("is_favorite"))
+        is_favorite = PostProject.objects.filter(pk=pk).values_list("is_favorite", flat=True).first()
+        return Response({"is_favorite": is_favorite})
 
     @action(detail=True, methods=["post"])
     def publish(self, request, pk=None):
-        project = self.get_object()
-        project.status = "published"
-        project.published_at = timezone.now()
-        project.save(update_fields=["status", "published_at"])
+        self._update_own(pk, status="published", published_at=timezone.now())
         return Response({"status": "published"})
 
     @action(detail=True, methods=["post"])
     def update_post(self, request, pk=None):
         """Manually edit the final post."""
-        project = self.get_object()
         new_content = request.data.get("content", "")
-        if new_content:
-            project.final_post = new_content
-            project.save(update_fields=["final_post"])
-        return Response({"final_post": project.final_post})
+        if not new_content:
+            return Response({"final_post": self.get_object().final_post})
+        # A batch evaluation still in flight was for the old text
+        self._update_own(pk, final_post=new_content, groundedness_batch_id="")
+        return Response({"final_post": new_content})
+
+    def _release_claim(self, project_ids):
+        """Return queued projects to draft when their task never reached the broker."""
+        PostProject.objects.filter(
+            id__in=project_ids, user=self.request.user, status="queued",
+        ).update(status="draft", updated_at=Now())
+        invalidate_dashboard(self.request.user.id)
+
+    def _update_own(self, pk, **values):
+        """Single UPDATE on one of the user's projects; 404 if there is no such project."""
+        try:
+            # updated_at is auto_now, which .update() doesn't apply on its own
+            updated = PostProject.objects.filter(pk=pk, user=self.request.user).update(updated_at=Now(), **values)
+        except (ValueError, ValidationError):  # malformed UUID
+            updated = 0
+        if not updated:
+            raise Http404
+        # .update() skips post_save, so drop the dashboard entry here
+        invalidate_dashboard(self.request.user.id)
 
 
 # --- Agent Runs ---
 
 class AgentRunViewSet(viewsets.ReadOnlyModelViewSet):
-    serializer_class = AgentRunSerializer
-
     def get_queryset(self):
-        return AgentRun.objects.filter(
-            project__user=self.request.user
-        ).select_related("project").prefetch_related("steps", "findings", "drafts")
+        if self.action == "list":
+            drafts = PostDraft.objects.defer("content", "critique_notes").annotate(preview=DRAFT_PREVIEW)
+        else:
+            drafts = PostDraft.objects.all()
+        return AgentRun.objects.filter(project__user=self.request.user).prefetch_related(
+            "steps",
+            Prefetch("findings", queryset=findings_without_raw()),
+            Prefetch("drafts", queryset=drafts),
+        )
+
+    def get_serializer_class(self):
+        if self.action == "list":
+            return AgentRunListSerializer
+        return AgentRunSerializer
 
 
 # --- Analytics ---
@@ -226,32 +406,53 @@ class ContentCalendarViewSet(viewsets.ModelViewSet):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def dashboard_stats(request):
-    user = request.user
+    key = dashboard_cache_key(request.user.id)
+    cached = _cache_get(key)
+    if cached is None:
+        stats = _compute_dashboard_stats(request.user)
+        cached = (_etag(stats), stats)
+        _cache_set(key, cached, DASHBOARD_CACHE_TTL)
+
+    etag, stats = cached
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(stats, headers={"ETag": etag})
+
+
+def _etag(data) -> str:
+    return f'"{hashlib.blake2b(json_dumps(data, sort_keys=True), digest_size=8).hexdigest()}"'
+
+
+def _compute_dashboard_stats(user) -> dict:
     now = timezone.now()
     week_ago = now - timedelta(days=7)
     month_ago = now - timedelta(days=30)
 
     projects = PostProject.objects.filter(user=user)
+    totals = projects.aggregate(
+        total=Count("id"),
+        published=Count("id", filter=Q(status="published")),
+        week=Count("id", filter=Q(created_at__gte=week_ago)),
+        month=Count("id", filter=Q(created_at__gte=month_ago)),
+        avg_groundedness=Avg("groundedness_score"),  # AVG skips NULL scores
+        revisions=Sum("revision_count"),
+    )
+
+    # One LIMIT 5 query (annotations included), evaluated before serialization starts
+    recent = list(with_draft_summary(projects.only(*PROJECT_LIST_COLUMNS))[:5])
 
     stats = {
-        "total_projects": projects.count(),
-        "published_posts": projects.filter(status="published").count(),
-        "avg_groundedness": projects.filter(
-            groundedness_score__isnull=False
-        ).aggregate(avg=Avg("groundedness_score"))["avg"],
-        "total_revisions": AgentRun.objects.filter(
-            project__user=user
-        ).aggregate(total=Sum("total_revisions"))["total"] or 0,
-        "posts_this_week": projects.filter(created_at__gte=week_ago).count(),
-        "posts_this_month": projects.filter(created_at__gte=month_ago).count(),
-        "top_tones": list(
-            projects.values("tone")
-            .annotate(count=Count("id"))
-            .order_by("-count")[:5]
-        ),
-        "recent_projects": PostProjectListSerializer(
-            projects[:5], many=True
-        ).data,
+        "total_projects": totals["total"],
+        "published_posts": totals["published"],
+        "avg_groundedness": totals["avg_groundedness"],
+        "total_revisions": totals["revisions"] or 0,
+        "posts_this_week": totals["week"],
+        "posts_this_month": totals["month"],
+        "top_tones": [
+            {"tone": tone, "count": count}
+            for tone, count in projects.values_list("tone").annotate(count=Count("id")).order_by("-count")[:5]
+        ],
+        "recent_projects": PostProjectListSerializer(recent, many=True).data,
     }
 
-    return Response(stats)
+    return stats
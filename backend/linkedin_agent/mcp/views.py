@@ -6,21 +6,30 @@ consumed by any MCP-compatible client (Claude Desktop, etc.).
 Follows the MCP specification for tool discovery and invocation.
 """
 
-import json
+import hashlib
 import logging
-from django.http import JsonResponse
+from asgiref.sync import sync_to_async
+from celery.result import AsyncResult
+from django.core.cache import cache
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 
+from linkedin_agent.agents.prompts import CRITIC_PROMPT, compile_prompt
+from linkedin_agent.utils import body_etag, jresp, json_dumps, json_loads, static_jresp
+
 logger = logging.getLogger(__name__)
 
+# Tavily's own ceiling for results per search
+RESEARCH_MAX_RESULTS = 20
+
 # MCP Tool definitions - expose agent capabilities as tools
 MCP_TOOLS = [
     {
         "name": "generate_linkedin_post",
         "description": "Generate a professional LinkedIn post using a multi-agent AI system. "
                        "Uses Supervisor, Researcher, Writer, and Critic agents to produce "
-                       "high-quality, research-backed LinkedIn content.",
+                       "high-quality, research-backed LinkedIn content. Runs in the background: "
+                       "returns a task_id whose result is read from tools/status/.",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -62,7 +71,9 @@ MCP_TOOLS = [
                 "max_results": {
                     "type": "integer",
                     "description": "Maximum number of search results",
-                    "default": 5
+                    "default": 5,
+                    "minimum": 1,
+                    "maximum": RESEARCH_MAX_RESULTS
                 }
             },
             "required": ["query"]
@@ -71,7 +82,8 @@ MCP_TOOLS = [
     {
         "name": "evaluate_post_groundedness",
         "description": "Evaluate how well a LinkedIn post is grounded in research findings. "
-                       "Returns a score (0-5) and detailed analysis.",
+                       "Returns a score (0-5) and detailed analysis. Runs in the background: "
+                       "returns a task_id whose result is read from tools/status/.",
         "inputSchema": {
             "type": "object",
             "properties": {
@@ -158,66 +170,129 @@ MCP_RESOURCES = [
     },
 ]
 
+MCP_MANIFEST = {
+    "name": "linkedin-post-agent",
+    "version": "1.0.0",
+    "description": "Multi-Agent LinkedIn Post Creator with research, writing, critique, and evaluation capabilities.",
+    "protocol_version": "2024-11-05",
+    "capabilities": {
+        "tools": {"listChanged": False},
+        "resources": {"subscribe": False, "listChanged": False},
+        "prompts": {"listChanged": False},
+    },
+}
+
+# Discovery payloads are constant, so encode them once at import
+_MANIFEST_BYTES = json_dumps(MCP_MANIFEST)
+_TOOLS_BYTES = json_dumps({"tools": MCP_TOOLS})
+_RESOURCES_BYTES = json_dumps({"resources": MCP_RESOURCES})
+_MANIFEST_ETAG = body_etag(_MANIFEST_BYTES)
+_TOOLS_ETAG = body_etag(_TOOLS_BYTES)
+_RESOURCES_ETAG = body_etag(_RESOURCES_BYTES)
+MCP_STATIC_MAX_AGE = 300
+
+# How long (seconds) a queued tool call's result can be polled from tools/status/
+MCP_TASK_TTL = 60 * 60
+
+# How long (seconds) an identical critique_post call (e.g. a client retry) reuses the last critique
+MCP_CRITIQUE_CACHE_TTL = 5 * 60
+
+# Lazy discovery: clients that opt in list name + description only and fetch
+# a tool's inputSchema when they are about to call it
+_TOOL_SUMMARIES_BYTES = json_dumps({
+    "tools": [{"name": t["name"], "description": t["description"]} for t in MCP_TOOLS],
+})
+_TOOL_SUMMARIES_ETAG = body_etag(_TOOL_SUMMARIES_BYTES)
+_TOOL_SCHEMA_BYTES = {
+    t["name"]: json_dumps({"name": t["name"], "inputSchema": t["inputSchema"]}) for t in MCP_TOOLS
+}
+_TOOL_SCHEMA_ETAGS = {name: body_etag(body) for name, body in _TOOL_SCHEMA_BYTES.items()}
+
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def mcp_manifest(request):
     """MCP server manifest - describes capabilities."""
-    return JsonResponse({
-        "name": "linkedin-post-agent",
-        "version": "1.0.0",
-        "description": "Multi-Agent LinkedIn Post Creator with research, writing, critique, and evaluation capabilities.",
-        "protocol_version": "2024-11-05",
-        "capabilities": {
-            "tools": {"listChanged": False},
-            "resources": {"subscribe": False, "listChanged": False},
-            "prompts": {"listChanged": False},
-        },
-    })
+    return static_jresp(request, _MANIFEST_BYTES, _MANIFEST_ETAG, MCP_STATIC_MAX_AGE)
 
 
 @csrf_exempt
 @require_http_methods(["GET"])
 def mcp_tools_list(request):
-    """List available MCP tools."""
-    return JsonResponse({"tools": MCP_TOOLS})
+    """List available MCP tools; ?schemas=0 leaves out each tool's inputSchema."""
+    if request.GET.get("schemas") == "0":
+        return static_jresp(request, _TOOL_SUMMARIES_BYTES, _TOOL_SUMMARIES_ETAG, MCP_STATIC_MAX_AGE)
+    return static_jresp(request, _TOOLS_BYTES, _TOOLS_ETAG, MCP_STATIC_MAX_AGE)
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def mcp_tool_schema(request):
+    """Return the inputSchema of the tool named by ?name=."""
+    name = request.GET.get("name", "")
+    body = _TOOL_SCHEMA_BYTES.get(name)
+    if body is None:
+        return jresp({"error": f"Unknown tool: {name}"}, status=404)
+    return static_jresp(request, body, _TOOL_SCHEMA_ETAGS[name], MCP_STATIC_MAX_AGE)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def mcp_tools_call(request):
-    """Execute an MCP tool call."""
+async def mcp_tools_call(request):
+    """Execute an MCP tool call. Handlers are async, so a call waiting on an LLM doesn't hold a worker thread."""
     try:
-        body = json.loads(request.body)
+        body = json_loads(request.body)
         tool_name = body.get("name")
         arguments = body.get("arguments", {})
 
         handler = TOOL_HANDLERS.get(tool_name)
         if not handler:
-            return JsonResponse(
+            return jresp(
                 {"error": f"Unknown tool: {tool_name}"},
                 status=404
             )
 
-        result = handler(arguments, request)
-        return JsonResponse({
-            "content": [{"type": "text", "text": json.dumps(result, default=str)}],
+        result = await handler(arguments, request)
+        return jresp({
+            "content": [{"type": "text", "text": json_dumps(result).decode()}],
             "isError": False,
         })
 
     except Exception as e:
         logger.error(f"MCP tool call error: {e}", exc_info=True)
-        return JsonResponse({
+        return jresp({
             "content": [{"type": "text", "text": str(e)}],
             "isError": True,
         }, status=500)
 
 
+@csrf_exempt
+@require_http_methods(["GET"])
+def mcp_tools_status(request):
+    """Result of a long-running tool call queued by tools/call (see _queued)."""
+    task_id = request.GET.get("task_id", "")
+    if not request.user.is_authenticated or cache.get(_task_owner_key(task_id)) != request.user.id:
+        return jresp({"error": f"Unknown task: {task_id}"}, status=404)
+
+    result = AsyncResult(task_id)
+    if not result.ready():
+        return jresp({"task_id": task_id, "status": result.state.lower()})
+    if result.failed():
+        return jresp({
+            "content": [{"type": "text", "text": str(result.result)}],
+            "isError": True,
+        })
+    return jresp({
+        "content": [{"type": "text", "text": json_dumps(result.result).decode()}],
+        "isError": False,
+    })
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def mcp_resources_list(request):
     """List available MCP resources."""
-    return JsonResponse({"resources": MCP_RESOURCES})
+    return static_jresp(request, _RESOURCES_BYTES, _RESOURCES_ETAG, MCP_STATIC_MAX_AGE)
 
 
 @csrf_exempt
@@ -225,53 +300,66 @@ def mcp_resources_list(request):
 def mcp_resources_read(request):
     """Read an MCP resource."""
     try:
-        body = json.loads(request.body)
+        body = json_loads(request.body)
         uri = body.get("uri", "")
 
-        if uri == "linkedin-agent://templates":
-            from linkedin_agent.api.models import PostTemplate
-            templates = list(PostTemplate.objects.filter(is_system=True).values(
-                "id", "name", "tone", "category", "description"
-            ))
-            return JsonResponse({
-                "contents": [{"uri": uri, "mimeType": "application/json",
-                              "text": json.dumps(templates, default=str)}]
-            })
-
-        if uri == "linkedin-agent://recent-posts":
-            from linkedin_agent.api.models import PostProject
-            posts = list(PostProject.objects.filter(
-                status__in=["approved", "published"]
-            ).order_by("-created_at")[:10].values(
-                "id", "title", "topic", "tone", "final_post",
-                "groundedness_score", "created_at"
-            ))
-            return JsonResponse({
-                "contents": [{"uri": uri, "mimeType": "application/json",
-                              "text": json.dumps(posts, default=str)}]
-            })
-
-        return JsonResponse({"error": f"Unknown resource: {uri}"}, status=404)
+        handler = RESOURCE_HANDLERS.get(uri)
+        if not handler:
+            return jresp({"error": f"Unknown resource: {uri}"}, status=404)
+
+        return jresp({
+            "contents": [{"uri": uri, "mimeType": "application/json",
+                          "text": json_dumps(handler(request)).decode()}]
+        })
 
     except Exception as e:
-        return JsonResponse({"error": str(e)}, status=500)
+        return jresp({"error": str(e)}, status=500)
 
 
 # --- Tool Handler Implementations ---
 
-def _handle_generate_post(args, request):
-    """Handle generate_linkedin_post tool."""
-    from linkedin_agent.api.models import PostProject, APIConfiguration
-    from linkedin_agent.agents.workflow import LinkedInPostWorkflow
+# critique_post reviews a standalone post: no task context, default length target
+_critic_prompt = compile_prompt(CRITIC_PROMPT, main_task="", word_count_min=150, word_count_max=300)
+
+
+async def _llm_config(request):
+    """The caller's credentials (cached by services.config), or None for anonymous calls."""
+    user = await request.auser()
+    if not user.is_authenticated:
+        return None
+    from linkedin_agent.services.config import aget_llm_config
+    return await aget_llm_config(user.id)
+
+
+async def _queued(task, args, request):
+    """
+    Queue `task` for the caller and record them as its owner, so only they
+    can read its result from tools/status/.
+    """
+    user = await request.auser()
+    result = await sync_to_async(task.delay)(args, user.id)
+    await cache.aset(_task_owner_key(result.id), user.id, MCP_TASK_TTL)
+    return {"task_id": result.id, "status": "queued"}
+
+
+def _task_owner_key(task_id: str) -> str:
+    return f"mcp:task:{task_id}"
 
-    # Use system config or request user config
-    config = None
-    if request.user.is_authenticated:
-        config = APIConfiguration.objects.filter(user=request.user).first()
 
+async def _handle_generate_post(args, request):
+    """Handle generate_linkedin_post tool: queue the run; the post is fetched from tools/status/."""
+    config = await _llm_config(request)
     if not config or not config.openai_api_key:
         return {"error": "API key not configured. Please configure OpenAI API key in settings."}
 
+    from linkedin_agent.api.tasks import mcp_generate_post_task
+    return await _queued(mcp_generate_post_task, args, request)
+
+
+def run_generate_post(args, config):
+    """Body of generate_linkedin_post, executed by mcp_generate_post_task."""
+    from linkedin_agent.agents.workflow import LinkedInPostWorkflow
+
     workflow = LinkedInPostWorkflow(
         openai_api_key=config.openai_api_key,
         openai_base_url=config.openai_base_url,
@@ -296,40 +384,36 @@ def _handle_generate_post(args, request):
     }
 
 
-def _handle_research(args, request):
+async def _handle_research(args, request):
     """Handle research_topic tool."""
-    from linkedin_agent.api.models import APIConfiguration
-    from langchain_tavily import TavilySearch
-
-    config = None
-    if request.user.is_authenticated:
-        config = APIConfiguration.objects.filter(user=request.user).first()
+    from linkedin_agent.agents.clients import get_tavily
 
+    config = await _llm_config(request)
     if not config or not config.tavily_api_key:
         return {"error": "Tavily API key not configured."}
 
-    tool = TavilySearch(
-        max_results=args.get("max_results", 5),
-        topic="general",
-        search_depth="basic",
-        api_key=config.tavily_api_key,
-    )
-    results = tool.invoke({"query": args["query"]})
+    try:
+        max_results = min(max(int(args.get("max_results", 5)), 1), RESEARCH_MAX_RESULTS)
+    except (TypeError, ValueError):
+        return {"error": "max_results must be an integer."}
+    results = await get_tavily(config.tavily_api_key, max_results).ainvoke({"query": args["query"]})
     return {"results": results}
 
 
-def _handle_evaluate(args, request):
-    """Handle evaluate_post_groundedness tool."""
-    from linkedin_agent.api.models import APIConfiguration
-    from linkedin_agent.agents.workflow import LinkedInPostWorkflow
-
-    config = None
-    if request.user.is_authenticated:
-        config = APIConfiguration.objects.filter(user=request.user).first()
-
+async def _handle_evaluate(args, request):
+    """Handle evaluate_post_groundedness tool: queue the evaluation; poll tools/status/."""
+    config = await _llm_config(request)
     if not config or not config.openai_api_key:
         return {"error": "OpenAI API key not configured."}
 
+    from linkedin_agent.api.tasks import mcp_evaluate_post_task
+    return await _queued(mcp_evaluate_post_task, args, request)
+
+
+def run_evaluate(args, config):
+    """Body of evaluate_post_groundedness, executed by mcp_evaluate_post_task."""
+    from linkedin_agent.agents.workflow import LinkedInPostWorkflow
+
     workflow = LinkedInPostWorkflow(
         openai_api_key=config.openai_api_key,
         openai_base_url=config.openai_base_url,
@@ -341,76 +425,84 @@ def _handle_evaluate(args, request):
     )
 
 
-def _handle_critique(args, request):
+async def _handle_critique(args, request):
     """Handle critique_post tool."""
-    from linkedin_agent.api.models import APIConfiguration
-    from linkedin_agent.agents.prompts import CRITIC_PROMPT
-    from langchain_openai import ChatOpenAI
-
-    config = None
-    if request.user.is_authenticated:
-        config = APIConfiguration.objects.filter(user=request.user).first()
+    from linkedin_agent.agents.clients import get_llm
 
+    config = await _llm_config(request)
     if not config or not config.openai_api_key:
         return {"error": "OpenAI API key not configured."}
 
-    llm_kwargs = {"model": config.openai_model, "temperature": 0, "api_key": config.openai_api_key}
-    if config.openai_base_url:
-        llm_kwargs["base_url"] = config.openai_base_url
-    llm = ChatOpenAI(**llm_kwargs)
+    draft = args["post_content"]
+    tone = args.get("tone", "professional")
+    target_audience = args.get("target_audience", "professionals")
 
-    prompt = CRITIC_PROMPT.format(
-        main_task="",
-        draft=args["post_content"],
-        tone=args.get("tone", "professional"),
-        target_audience=args.get("target_audience", "professionals"),
-        word_count_min=150,
-        word_count_max=300,
-    )
-    response = llm.invoke(prompt)
-    return {"critique": response.content}
+    user = await request.auser()
+    raw = json_dumps([user.id, config.openai_model, config.openai_base_url, draft, tone, target_audience])
+    key = f"mcp:critique:{hashlib.blake2b(raw, digest_size=16).hexdigest()}"
+    critique = await cache.aget(key)
+    if critique is None:
+        llm = get_llm(config.openai_api_key, config.openai_model, config.openai_base_url)
+        response = await llm.ainvoke(_critic_prompt(draft=draft, tone=tone, target_audience=target_audience))
+        critique = response.content
+        await cache.aset(key, critique, MCP_CRITIQUE_CACHE_TTL)
+    return {"critique": critique}
 
 
-def _handle_list_templates(args, request):
+async def _handle_list_templates(args, request):
     """Handle list_post_templates tool."""
     from linkedin_agent.api.models import PostTemplate
-    templates = list(PostTemplate.objects.filter(is_system=True).values(
+    templates = [t async for t in PostTemplate.objects.filter(is_system=True).values(
         "name", "tone", "category", "description", "structure_prompt"
-    ))
+    )]
     return {"templates": templates}
 
 
-def _handle_generate_hashtags(args, request):
+async def _handle_generate_hashtags(args, request):
     """Handle generate_hashtags tool."""
-    from linkedin_agent.api.models import APIConfiguration
-    from linkedin_agent.agents.prompts import HASHTAG_GENERATOR_PROMPT
-    from langchain_openai import ChatOpenAI
-
-    config = None
-    if request.user.is_authenticated:
-        config = APIConfiguration.objects.filter(user=request.user).first()
+    from linkedin_agent.agents.clients import get_llm
+    from linkedin_agent.agents.prompts import format_hashtag_generator
 
+    config = await _llm_config(request)
     if not config or not config.openai_api_key:
         return {"error": "OpenAI API key not configured."}
 
-    llm_kwargs = {"model": config.openai_model, "temperature": 0.3, "api_key": config.openai_api_key}
-    if config.openai_base_url:
-        llm_kwargs["base_url"] = config.openai_base_url
-    llm = ChatOpenAI(**llm_kwargs)
+    llm = get_llm(config.openai_api_key, config.openai_model, config.openai_base_url, temperature=0.3)
 
-    prompt = HASHTAG_GENERATOR_PROMPT.format(
+    prompt = format_hashtag_generator(
         post_content=args["content"],
         topic=args["content"][:100],
         category="general",
     )
-    response = llm.invoke(prompt)
+    response = await llm.ainvoke(prompt)
     try:
-        hashtags = json.loads(response.content)
-    except json.JSONDecodeError:
+        hashtags = json_loads(response.content)
+    except ValueError:
         hashtags = [tag.strip() for tag in response.content.split(",")]
     return {"hashtags": hashtags[:args.get("count", 5)]}
 
 
+# --- Resource Readers ---
+
+def _read_templates(request):
+    """Read linkedin-agent://templates."""
+    from linkedin_agent.api.models import PostTemplate
+    return list(PostTemplate.objects.filter(is_system=True).values(
+        "id", "name", "tone", "category", "description"
+    ))
+
+
+def _read_recent_posts(request):
+    """Read linkedin-agent://recent-posts."""
+    from linkedin_agent.api.models import PostProject
+    return list(PostProject.objects.filter(
+        status__in=["approved", "published"]
+    ).order_by("-created_at")[:10].values(
+        "id", "title", "topic", "tone", "final_post",
+        "groundedness_score", "created_at"
+    ))
+
+
 TOOL_HANDLERS = {
     "generate_linkedin_post": _handle_generate_post,
     "research_topic": _handle_research,
@@ -419,3 +511,8 @@ TOOL_HANDLERS = {
     "list_post_templates": _handle_list_templates,
     "generate_hashtags": _handle_generate_hashtags,
 }
+
+RESOURCE_HANDLERS = {
+    "linkedin-agent://templates": _read_templates,
+    "linkedin-agent://recent-posts": _read_recent_posts,
+}
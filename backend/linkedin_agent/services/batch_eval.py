@@ -0,0 +1,184 @@
+"""
+Groundedness evaluation through the OpenAI Batch API.
+Posts that aren't needed soon (e.g. content calendar entries scheduled
+later) are evaluated in 24h batches at half the price of synchronous
+calls, and without eating into the user's live rate limits.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+from openai import OpenAI
+
+from linkedin_agent.api.models import APIConfiguration, ContentCalendar, PostProject, ResearchFinding
+from linkedin_agent.agents.prompts import format_groundedness
+from linkedin_agent.agents.workflow import parse_groundedness
+from linkedin_agent.utils import json_dumps, json_loads
+
+logger = logging.getLogger(__name__)
+
+# Calendar entries scheduled at least this far out go through the Batch API
+BATCH_EVAL_MIN_LEAD = timedelta(hours=1)
+BATCH_FAILED_STATES = {"failed", "expired", "cancelled"}
+
+
+def _client(config) -> OpenAI:
+    return OpenAI(api_key=config.openai_api_key)
+
+
+def _batch_line(project: PostProject, findings: list, model: str) -> bytes:
+    prompt = format_groundedness(
+        research_findings="\n\n".join(findings),
+        draft=project.final_post,
+    )
+    return json_dumps({
+        "custom_id": str(project.id),
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model,
+            "temperature": 0,
+            "max_tokens": 4096,
+            "messages": [{"role": "user", "content": prompt}],
+        },
+    }) + b"\n"
+
+
+def submit_groundedness_batch(projects, config) -> str:
+    """Upload one batch evaluating `projects` (all owned by config.user) and record its id."""
+    # Every project's findings in one query, in the order project.findings would give
+    findings = defaultdict(list)
+    for project_id, summary in ResearchFinding.objects.filter(
+        project_id__in=[p.id for p in projects],
+    ).values_list("project_id", "summary"):
+        findings[project_id].append(summary)
+    lines = [_batch_line(project, findings[project.id], config.openai_eval_model) for project in projects]
+
+    client = _client(config)
+    upload = client.files.create(file=("groundedness.jsonl", b"".join(lines)), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=upload.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    PostProject.objects.filter(id__in=[p.id for p in projects]).update(groundedness_batch_id=batch.id)
+    logger.info(f"Submitted groundedness batch {batch.id} for {len(projects)} posts")
+    return batch.id
+
+
+def _scheduled_later():
+    cutoff = datetime.now(timezone.utc) + BATCH_EVAL_MIN_LEAD
+    later = Q(scheduled_date__gt=cutoff.date()) | Q(
+        scheduled_date=cutoff.date(), scheduled_time__gt=cutoff.time(),
+    )
+    return ContentCalendar.objects.filter(later, is_completed=False, project__isnull=False)
+
+
+def defers_groundedness(project: PostProject, config) -> bool:
+    """True if this post's evaluation can wait for the next batch instead of running inline."""
+    if config.openai_base_url:
+        return False
+    return _scheduled_later().filter(project=project).exists()
+
+
+def pending_calendar_projects():
+    """Calendar posts due later than BATCH_EVAL_MIN_LEAD that still need an evaluation."""
+    project_ids = _scheduled_later().values_list("project_id", flat=True)
+    return PostProject.objects.filter(
+        id__in=project_ids,
+        groundedness_score__isnull=True,
+        groundedness_batch_id="",
+    ).exclude(final_post="")
+
+
+def submit_calendar_batches() -> list:
+    """Submit one batch per user for their pending calendar posts."""
+    by_user = defaultdict(list)
+    for project in pending_calendar_projects():
+        by_user[project.user_id].append(project)
+
+    configs = APIConfiguration.objects.filter(user_id__in=by_user).exclude(openai_api_key="")
+    batch_ids = []
+    for config in configs:
+        if config.openai_base_url:
+            # Batch API is OpenAI-only; these posts get evaluated synchronously as usual
+            continue
+        try:
+            batch_ids.append(submit_groundedness_batch(by_user[config.user_id], config))
+        except Exception as e:
+            logger.warning(f"Groundedness batch submit failed for user {config.user_id}: {e}")
+    return batch_ids
+
+
+def _file_lines(client: OpenAI, file_id: str):
+    """Decoded JSONL entries of a batch output or error file."""
+    for line in client.files.content(file_id).text.splitlines():
+        if line.strip():
+            yield json_loads(line)
+
+
+def _line_error(entry: dict) -> str:
+    error = entry.get("error") or (entry.get("response") or {}).get("body", {}).get("error") or {}
+    return error.get("message") or "request failed in batch"
+
+
+def collect_groundedness_batches() -> int:
+    """Apply results of finished batches; returns the number of posts updated."""
+    pending = defaultdict(list)
+    for project_id, user_id, batch_id in PostProject.objects.exclude(
+        groundedness_batch_id="",
+    ).values_list("id", "user_id", "groundedness_batch_id"):
+        pending[(batch_id, user_id)].append(project_id)
+
+    configs = {c.user_id: c for c in APIConfiguration.objects.filter(user_id__in={u for _, u in pending})}
+    updated = 0
+    for (batch_id, user_id), project_ids in pending.items():
+        config = configs.get(user_id)
+        if config is None:
+            continue
+        client = _client(config)
+        try:
+            batch = client.batches.retrieve(batch_id)
+        except Exception as e:
+            logger.warning(f"Could not retrieve groundedness batch {batch_id}: {e}")
+            continue
+
+        if batch.status in BATCH_FAILED_STATES:
+            logger.warning(f"Groundedness batch {batch_id} ended as {batch.status}")
+            # Clear the marker so the next submit run picks these posts up again
+            PostProject.objects.filter(id__in=project_ids, groundedness_batch_id=batch_id).update(groundedness_batch_id="")
+            continue
+        if batch.status != "completed":
+            continue
+
+        results = {}
+        if batch.output_file_id:
+            for entry in _file_lines(client, batch.output_file_id):
+                try:
+                    content = entry["response"]["body"]["choices"][0]["message"]["content"]
+                    results[entry["custom_id"]] = parse_groundedness(content)
+                except Exception as e:
+                    results[entry["custom_id"]] = {"score": -1, "notes": f"Evaluation failed: {e}"}
+        if batch.error_file_id:
+            # Requests that failed inside the batch; recorded as failed evaluations
+            # so the next submit run doesn't send them again
+            for entry in _file_lines(client, batch.error_file_id):
+                results[entry["custom_id"]] = {"score": -1, "notes": f"Evaluation failed: {_line_error(entry)}"}
+
+        # Posts re-generated or edited since submission no longer carry this batch id
+        projects = list(PostProject.objects.filter(id__in=project_ids, groundedness_batch_id=batch_id).only(
+            "id", "groundedness_score", "groundedness_report", "groundedness_batch_id",
+        ))
+        for project in projects:
+            report = results.get(str(project.id))
+            project.groundedness_batch_id = ""
+            if report is not None:
+                project.groundedness_score = report.get("score", -1)
+                project.groundedness_report = report
+                updated += 1
+        PostProject.objects.bulk_update(
+            projects, ["groundedness_score", "groundedness_report", "groundedness_batch_id"], batch_size=200,
+        )
+    return updated
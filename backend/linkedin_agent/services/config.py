@@ -0,0 +1,111 @@
+"""
+Lightweight access to a user's API credentials.
+The agent layers only read a handful of APIConfiguration columns, so those
+are fetched with .values() into a plain slotted dataclass rather than
+materialising the model instance. Results are memoised in process, so the
+keys never leave Postgres and this process; the shared Django cache only
+holds a per-user version, which api.signals drops whenever the
+configuration is saved and every process then reloads.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, fields
+from typing import Optional
+
+from django.core.cache import cache
+
+from linkedin_agent.api.models import APIConfiguration
+
+logger = logging.getLogger(__name__)
+
+LLM_CONFIG_CACHE_TTL = 300
+LLM_CONFIG_MEMO_SIZE = 1024
+
+# user_id -> (version, expires_at, LLMConfig)
+_memo = {}
+
+
+@dataclass(slots=True, frozen=True)
+class LLMConfig:
+    """Read-only view of the APIConfiguration fields the agents use."""
+    openai_api_key: str
+    openai_base_url: str
+    openai_model: str
+    openai_eval_model: str
+    tavily_api_key: str
+
+
+CONFIG_FIELDS = tuple(f.name for f in fields(LLMConfig))
+
+
+def llm_config_cache_key(user_id: int) -> str:
+    return f"llm_config:{user_id}"
+
+
+def _memo_get(user_id: int, version: Optional[str]) -> Optional[LLMConfig]:
+    entry = _memo.get(user_id)
+    if version is not None and entry is not None and entry[0] == version and entry[1] > time.monotonic():
+        return entry[2]
+    return None
+
+
+def _memo_set(user_id: int, version: Optional[str], config: LLMConfig):
+    if version is None:  # cache unavailable: nothing to validate a memo against later
+        return
+    if len(_memo) >= LLM_CONFIG_MEMO_SIZE:
+        _memo.clear()
+    _memo[user_id] = (version, time.monotonic() + LLM_CONFIG_CACHE_TTL, config)
+
+
+def _config_version(user_id: int) -> Optional[str]:
+    """The user's current config version, starting one if there is none; None if the cache is down."""
+    key = llm_config_cache_key(user_id)
+    try:
+        version = cache.get(key)
+        if version is None:
+            version = str(time.time_ns())
+            cache.add(key, version, None)
+    except Exception as e:
+        logger.warning(f"LLM config version lookup failed: {e}")
+        return None
+    return version
+
+
+async def _aconfig_version(user_id: int) -> Optional[str]:
+    key = llm_config_cache_key(user_id)
+    try:
+        version = await cache.aget(key)
+        if version is None:
+            version = str(time.time_ns())
+            await cache.aadd(key, version, None)
+    except Exception as e:
+        logger.warning(f"LLM config version lookup failed: {e}")
+        return None
+    return version
+
+
+def get_llm_config(user_id: int) -> Optional[LLMConfig]:
+    """Return the user's LLMConfig, or None if they have no configuration."""
+    version = _config_version(user_id)
+    config = _memo_get(user_id, version)
+    if config is None:
+        row = APIConfiguration.objects.filter(user_id=user_id).values(*CONFIG_FIELDS).first()
+        if row is None:
+            return None
+        config = LLMConfig(**row)
+        _memo_set(user_id, version, config)
+    return config
+
+
+async def aget_llm_config(user_id: int) -> Optional[LLMConfig]:
+    """Async variant of get_llm_config."""
+    version = await _aconfig_version(user_id)
+    config = _memo_get(user_id, version)
+    if config is None:
+        row = await APIConfiguration.objects.filter(user_id=user_id).values(*CONFIG_FIELDS).afirst()
+        if row is None:
+            return None
+        config = LLMConfig(**row)
+        _memo_set(user_id, version, config)
+    return config
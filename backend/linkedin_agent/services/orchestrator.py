@@ -3,42 +3,83 @@ Orchestrator service - bridges Django models with the agent workflow.
 Handles running agents, persisting state, and publishing real-time updates.
 """
 
-import json
 import logging
 import time
 from datetime import datetime, timezone
+from functools import lru_cache
 
 import redis
 from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
 
-from linkedin_agent.api.models import (
-    PostProject, AgentRun, AgentStep, ResearchFinding, PostDraft, APIConfiguration,
-)
+from linkedin_agent.api.models import PostProject, AgentRun, ResearchFinding, PostDraft
+from linkedin_agent.api.signals import invalidate_dashboard
+from linkedin_agent.agents.checkpoint import delete_checkpoints
 from linkedin_agent.agents.workflow import LinkedInPostWorkflow
+from linkedin_agent.services.batch_eval import defers_groundedness
+from linkedin_agent.services.config import get_llm_config
+from linkedin_agent.services.semantic_cache import SemanticCache
+from linkedin_agent.utils import is_approval, json_dumps
 
 logger = logging.getLogger(__name__)
 
+# The PostProject columns a run reads; the large output fields are only written
+RUN_PROJECT_FIELDS = (
+    "id", "user", "status", "topic", "tone", "target_audience",
+    "target_word_count_min", "target_word_count_max", "language",
+    "include_hashtags", "include_cta", "include_emoji",
+    "template", "template__structure_prompt",
+)
+
+# Project status while each agent works; other agents (supervisor) leave it as is
+AGENT_STATUS = {
+    "researcher": "researching",
+    "writer": "writing",
+    "critic": "reviewing",
+}
 
-def get_redis_client():
+
+@lru_cache(maxsize=1)
+def get_redis_client() -> redis.Redis:
+    """One client (and connection pool) per process, shared by every publish."""
     url = getattr(settings, "CELERY_BROKER_URL", "redis://localhost:6452/0")
-    return redis.from_url(url)
+    return redis.from_url(url, socket_keepalive=True, health_check_interval=30)
 
 
 def publish_step(run_id: str, data: dict):
     """Publish agent step to Redis pub/sub for real-time WebSocket delivery."""
     try:
-        r = get_redis_client()
-        r.publish(f"agent_run:{run_id}", json.dumps(data, default=str))
+        get_redis_client().publish(f"agent_run:{run_id}", json_dumps(data))
+    except Exception as e:
+        logger.warning(f"Redis publish error: {e}")
+
+
+def publish_steps(run_id: str, events: list):
+    """Publish several events to a run's channel, in order, in one round trip."""
+    channel = f"agent_run:{run_id}"
+    try:
+        pipe = get_redis_client().pipeline(transaction=False)
+        for data in events:
+            pipe.publish(channel, json_dumps(data))
+        pipe.execute()
     except Exception as e:
         logger.warning(f"Redis publish error: {e}")
 
 
-def run_post_generation(project_id: str, user_id: int) -> dict:
-    """Execute the multi-agent workflow for a project."""
-    project = PostProject.objects.get(id=project_id)
-    config = APIConfiguration.objects.get(user_id=user_id)
+def run_post_generation(project_id: str, user_id: int, thread_id: str = "") -> dict:
+    """
+    Execute the multi-agent workflow for a project. Calls sharing a
+    thread_id (e.g. retries of one Celery task) resume a checkpointed run.
+    """
+    project = PostProject.objects.select_related("template").only(*RUN_PROJECT_FIELDS).get(id=project_id)
+    config = get_llm_config(user_id)
 
-    if not config.openai_api_key:
+    if config is None or not config.openai_api_key:
+        # Release the "queued" claim taken at dispatch so the project can be retried
+        PostProject.objects.filter(pk=project.pk).update(status="failed")
+        invalidate_dashboard(project.user_id)
         raise ValueError("OpenAI API key not configured. Go to Settings to add your key.")
 
     # Create agent run
@@ -48,43 +89,52 @@ def run_post_generation(project_id: str, user_id: int) -> dict:
         started_at=datetime.now(timezone.utc),
     )
 
+    # Every published event carries both ids; format them once per run
+    run_id, project_id = str(run.id), str(project.id)
+
     project.status = "researching"
     project.save(update_fields=["status"])
 
-    step_data_buffer = []
+    # Steps are inserted in one batch by a Celery task once the run ends,
+    # keeping per-step INSERTs out of the agent loop
+    step_rows = []
 
     def on_step(data):
         """Callback for each agent step."""
-        step_data_buffer.append(data)
+        if data.get("event") == "tokens":
+            # Partial LLM output: forward to the UI only, nothing to persist
+            publish_step(run_id, {
+                "type": "agent_tokens",
+                "run_id": run_id,
+                "project_id": project_id,
+                **data,
+            })
+            return
+
         agent_name = data.get("agent", "unknown")
 
         # Update project status based on agent
-        status_map = {
-            "supervisor": project.status,
-            "researcher": "researching",
-            "writer": "writing",
-            "critic": "reviewing",
-        }
-        new_status = status_map.get(agent_name, project.status)
-        if new_status != project.status:
+        new_status = AGENT_STATUS.get(agent_name)
+        if new_status and new_status != project.status:
             project.status = new_status
-            project.save(update_fields=["status"])
-
-        # Persist step
-        AgentStep.objects.create(
-            run=run,
-            agent_name=agent_name if agent_name != "critic" else "critic",
-            step_number=data.get("step", 0),
-            output_data=data,
-            decision=data.get("decision", data.get("task", "")),
-            duration_ms=data.get("duration_ms"),
-        )
+            # Bare UPDATE: no save() machinery or signal dispatch on the step path
+            PostProject.objects.filter(pk=project.pk).update(status=new_status)
+            invalidate_dashboard(project.user_id)
+
+        # Buffer step for persist_agent_steps_task
+        step_rows.append({
+            "agent_name": agent_name,
+            "step_number": data.get("step", 0),
+            "output_data": data,
+            "decision": data.get("decision", data.get("task", "")),
+            "duration_ms": data.get("duration_ms"),
+        })
 
         # Publish for WebSocket
-        publish_step(str(run.id), {
+        publish_step(run_id, {
             "type": "agent_step",
-            "run_id": str(run.id),
-            "project_id": str(project.id),
+            "run_id": run_id,
+            "project_id": project_id,
             **data,
         })
 
@@ -97,7 +147,9 @@ def run_post_generation(project_id: str, user_id: int) -> dict:
             eval_model_name=config.openai_eval_model,
             tavily_api_key=config.tavily_api_key,
             max_revisions=settings.AGENT_CONFIG.get("MAX_REVISIONS", 5),
+            draft_candidates=settings.AGENT_CONFIG.get("DRAFT_CANDIDATES", 1),
             on_step=on_step,
+            cache=SemanticCache(user_id, config.openai_api_key, config.openai_base_url),
         )
 
         # Template instructions
@@ -108,6 +160,7 @@ def run_post_generation(project_id: str, user_id: int) -> dict:
         # Run the workflow
         result = workflow.run(
             topic=project.topic,
+            thread_id=thread_id,
             tone=project.tone,
             target_audience=project.target_audience,
             word_count_min=project.target_word_count_min,
@@ -119,86 +172,115 @@ def run_post_generation(project_id: str, user_id: int) -> dict:
             template_instructions=template_instructions,
         )
 
-        # Save research findings
-        for i, finding in enumerate(result.get("research_findings", [])):
-            ResearchFinding.objects.create(
-                project=project,
-                run=run,
-                query=project.topic,
-                summary=finding,
-                sources=[],
-            )
-
-        # Save final draft
-        draft = PostDraft.objects.create(
-            project=project,
-            run=run,
-            version=result.get("revision_number", 1),
-            content=result.get("draft", ""),
-            is_approved="APPROVED" in result.get("critique_notes", "").upper(),
-        )
-
-        # Run groundedness evaluation
-        try:
-            eval_result = workflow.evaluate_groundedness(
-                draft=result.get("draft", ""),
-                research_findings=result.get("research_findings", []),
-            )
-            project.groundedness_score = eval_result.get("score", -1)
-            project.groundedness_report = eval_result
-
-            publish_step(str(run.id), {
-                "type": "evaluation_complete",
-                "run_id": str(run.id),
-                "project_id": str(project.id),
-                "groundedness_score": eval_result.get("score"),
-                "report": eval_result,
-            })
-        except Exception as e:
-            logger.warning(f"Groundedness evaluation failed: {e}")
-
-        # Finalize
-        project.final_post = result.get("draft", "")
-        project.status = "approved"
-        project.save()
-
-        run.status = "completed"
-        run.total_revisions = result.get("revision_number", 0)
-        run.completed_at = datetime.now(timezone.utc)
-        run.save()
-
-        publish_step(str(run.id), {
+        # Run groundedness evaluation - calendar posts due later wait for the next Batch API run.
+        # Whatever happens, the previous draft's score and any batch still evaluating
+        # it no longer apply to this draft.
+        grounding = {"groundedness_score": None, "groundedness_report": None, "groundedness_batch_id": ""}
+        events = []
+        if defers_groundedness(project, config):
+            logger.info(f"Deferring groundedness evaluation of {project.id} to the batch queue")
+        else:
+            try:
+                eval_result = workflow.evaluate_groundedness(
+                    draft=result.get("draft", ""),
+                    research_findings=result.get("research_findings", []),
+                )
+                grounding.update(
+                    groundedness_score=eval_result.get("score", -1),
+                    groundedness_report=eval_result,
+                )
+                events.append({
+                    "type": "evaluation_complete",
+                    "run_id": run_id,
+                    "project_id": project_id,
+                    "groundedness_score": eval_result.get("score"),
+                    "report": eval_result,
+                })
+            except Exception as e:
+                logger.warning(f"Groundedness evaluation failed: {e}")
+
+        events.append({
             "type": "workflow_complete",
-            "run_id": str(run.id),
-            "project_id": str(project.id),
+            "run_id": run_id,
+            "project_id": project_id,
             "status": "completed",
             "final_post": result.get("draft", ""),
             "revisions": result.get("revision_number", 0),
-            "groundedness_score": project.groundedness_score,
+            "groundedness_score": grounding.get("groundedness_score"),
         })
 
+        # Finalize in one transaction - one UPDATE per row, timestamps taken by
+        # the database. The closing events are published only once it commits,
+        # so a client reacting to them always reads the finished rows.
+        with transaction.atomic():
+            ResearchFinding.objects.bulk_create([
+                ResearchFinding(
+                    project=project,
+                    run=run,
+                    query=project.topic,
+                    summary=finding,
+                    sources=[],
+                )
+                for finding in result.get("research_findings", [])
+            ], batch_size=200)
+
+            PostDraft.objects.create(
+                project=project,
+                run=run,
+                version=result.get("revision_number", 1),
+                content=result.get("draft", ""),
+                word_count=result.get("word_count", 0),
+                is_approved=is_approval(result.get("critique_notes", "")),
+            )
+
+            project.final_post = result.get("draft", "")
+            project.status = "approved"
+            PostProject.objects.filter(pk=project.pk).update(
+                final_post=project.final_post,
+                status=project.status,
+                revision_count=F("revision_count") + result.get("revision_number", 0),
+                updated_at=Now(),
+                **grounding,
+            )
+            AgentRun.objects.filter(pk=run.pk).update(
+                status="completed",
+                total_revisions=result.get("revision_number", 0),
+                completed_at=Now(),
+            )
+            # .update() skips post_save, so the dashboard entry is dropped explicitly
+            transaction.on_commit(lambda: invalidate_dashboard(project.user_id))
+            transaction.on_commit(lambda: publish_steps(run_id, events))
+            # Nothing resumes a completed thread
+            transaction.on_commit(lambda: delete_checkpoints(thread_id))
+
         return {
-            "run_id": str(run.id),
+            "run_id": run_id,
             "status": "completed",
             "final_post": result.get("draft", ""),
             "revisions": result.get("revision_number", 0),
-            "groundedness_score": project.groundedness_score,
+            "groundedness_score": grounding.get("groundedness_score"),
         }
 
     except Exception as e:
         logger.error(f"Workflow failed: {e}", exc_info=True)
         project.status = "failed"
         project.save(update_fields=["status"])
-        run.status = "failed"
-        run.error_message = str(e)
-        run.completed_at = datetime.now(timezone.utc)
-        run.save()
+        AgentRun.objects.filter(pk=run.pk).update(
+            status="failed",
+            error_message=str(e),
+            completed_at=Now(),
+        )
 
-        publish_step(str(run.id), {
+        publish_step(run_id, {
             "type": "workflow_error",
-            "run_id": str(run.id),
-            "project_id": str(project.id),
+            "run_id": run_id,
+            "project_id": project_id,
             "error": str(e),
         })
 
         raise
+
+    finally:
+        if step_rows:
+            from linkedin_agent.api.tasks import persist_agent_steps_task
+            transaction.on_commit(lambda: persist_agent_steps_task.delay(run_id, step_rows))
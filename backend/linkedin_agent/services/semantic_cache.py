@@ -0,0 +1,128 @@
+"""
+Semantic cache for agent outputs.
+Research summaries are matched to new queries by embedding similarity, so a
+near-duplicate topic skips the Tavily + LLM round trips. Groundedness
+results are cached on an exact hash of the user, eval model, draft and research.
+"""
+
+import hashlib
+import logging
+import math
+import operator
+from datetime import timedelta
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from langchain_openai import OpenAIEmbeddings
+
+from linkedin_agent.api.models import ResearchCache
+
+logger = logging.getLogger(__name__)
+
+GROUNDEDNESS_CACHE_TTL = 24 * 60 * 60
+
+try:
+    _dot = math.sumprod  # Python 3.12+
+except AttributeError:
+    def _dot(a, b):
+        return sum(map(operator.mul, a, b))
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    norm = math.sqrt(_dot(a, a) * _dot(b, b))
+    return _dot(a, b) / norm if norm else 0.0
+
+
+class SemanticCache:
+    """Per-user cache handed to LinkedInPostWorkflow as `cache`."""
+
+    def __init__(self, user_id: int, openai_api_key: str, openai_base_url: str = ""):
+        self.user_id = user_id
+        config = settings.AGENT_CONFIG
+        self.threshold = config.get("SEMANTIC_CACHE_THRESHOLD", 0.92)
+        self.ttl = timedelta(hours=config.get("SEMANTIC_CACHE_TTL_HOURS", 24))
+        self.scan_limit = config.get("SEMANTIC_CACHE_SCAN_LIMIT", 200)
+
+        embed_kwargs = {"model": config.get("EMBEDDING_MODEL", "text-embedding-3-small"), "api_key": openai_api_key}
+        if openai_base_url:
+            embed_kwargs["base_url"] = openai_base_url
+        self.embeddings = OpenAIEmbeddings(**embed_kwargs)
+        self._vectors = {}  # query -> embedding, so a miss doesn't embed twice
+
+    async def _embed(self, query: str) -> List[float]:
+        vector = self._vectors.get(query)
+        if vector is None:
+            vector = self._vectors[query] = await self.embeddings.aembed_query(query)
+        return vector
+
+    @staticmethod
+    def _research_context(main_task: str, target_audience: str) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(main_task.encode())
+        digest.update(b"\0")
+        digest.update(target_audience.encode())
+        return digest.hexdigest()
+
+    async def aget_research(self, query: str, main_task: str, target_audience: str) -> Optional[dict]:
+        """
+        Return {"findings", "sources"} from the closest recent query, if similar
+        enough and researched for the same parent task and audience.
+        """
+        try:
+            vector = await self._embed(query)
+            rows = ResearchCache.objects.filter(
+                user_id=self.user_id,
+                context=self._research_context(main_task, target_audience),
+                created_at__gte=timezone.now() - self.ttl,
+            ).values("embedding", "findings", "sources")[:self.scan_limit]
+
+            best, best_score = None, self.threshold
+            async for row in rows:
+                score = _cosine(vector, row["embedding"])
+                if score >= best_score:
+                    best, best_score = row, score
+        except Exception as e:
+            logger.warning(f"Semantic cache lookup failed: {e}")
+            return None
+
+        if best is None:
+            return None
+        logger.info(f"Semantic cache hit for '{query[:80]}' (similarity {best_score:.3f})")
+        return {"findings": best["findings"], "sources": best["sources"]}
+
+    async def aset_research(self, query: str, main_task: str, target_audience: str, findings: str, sources: list):
+        try:
+            await ResearchCache.objects.acreate(
+                user_id=self.user_id,
+                query=query,
+                context=self._research_context(main_task, target_audience),
+                embedding=await self._embed(query),
+                findings=findings,
+                sources=sources,
+            )
+        except Exception as e:
+            logger.warning(f"Semantic cache store failed: {e}")
+
+    def _groundedness_key(self, model: str, draft: str, research_text: str) -> str:
+        # Scores are per user and per evaluating model, like the rest of this cache
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(f"{self.user_id}\0{model}\0".encode())
+        digest.update(draft.encode())
+        digest.update(b"\0")
+        digest.update(research_text.encode())
+        return f"groundedness:{digest.hexdigest()}"
+
+    async def aget_groundedness(self, model: str, draft: str, research_text: str) -> Optional[dict]:
+        try:
+            return await cache.aget(self._groundedness_key(model, draft, research_text))
+        except Exception as e:
+            logger.warning(f"Groundedness cache lookup failed: {e}")
+            return None
+
+    async def aset_groundedness(self, model: str, draft: str, research_text: str, result: dict):
+        try:
+            await cache.aset(self._groundedness_key(model, draft, research_text), result, timeout=GROUNDEDNESS_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Groundedness cache store failed: {e}")
@@ -28,6 +28,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "django.middleware.gzip.GZipMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -56,6 +57,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "linkedin_agent.wsgi.application"
+ASGI_APPLICATION = "linkedin_agent.asgi.application"
 
 # Database
 DATABASE_URL = os.environ.get(
@@ -86,6 +88,9 @@ STORAGES = {
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Upper bound for request bodies; A2A payloads carry full drafts and research
+DATA_UPLOAD_MAX_MEMORY_SIZE = int(os.environ.get("DATA_UPLOAD_MAX_MEMORY_SIZE", 10 * 1024 * 1024))
+
 # CORS
 CORS_ALLOWED_ORIGINS = os.environ.get(
     "CORS_ALLOWED_ORIGINS",
@@ -107,6 +112,15 @@ REST_FRAMEWORK = {
         "rest_framework.filters.SearchFilter",
         "rest_framework.filters.OrderingFilter",
     ],
+    "DEFAULT_RENDERER_CLASSES": (
+        "linkedin_agent.api.renderers.ORJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
+    "DEFAULT_PARSER_CLASSES": (
+        "linkedin_agent.api.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
 }
@@ -121,11 +135,23 @@ SIMPLE_JWT = {
 # Celery
 CELERY_BROKER_URL = os.environ.get("REDIS_URL", "redis://localhost:6452/0")
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
-CELERY_ACCEPT_CONTENT = ["json"]
-CELERY_TASK_SERIALIZER = "json"
-CELERY_RESULT_SERIALIZER = "json"
+# msgpack keeps task and result payloads compact in Redis; json is still
+# accepted so messages queued before the switch can be consumed
+CELERY_ACCEPT_CONTENT = ["msgpack", "json"]
+CELERY_TASK_SERIALIZER = "msgpack"
+CELERY_RESULT_SERIALIZER = "msgpack"
 CELERY_TIMEZONE = "UTC"
 CELERY_BEAT_SCHEDULER = "django_celery_beat.schedulers:DatabaseScheduler"
+CELERY_BEAT_SCHEDULE = {
+    "submit-groundedness-batches": {
+        "task": "linkedin_agent.api.tasks.submit_groundedness_batches_task",
+        "schedule": 60 * 60,
+    },
+    "collect-groundedness-batches": {
+        "task": "linkedin_agent.api.tasks.collect_groundedness_batches_task",
+        "schedule": 10 * 60,
+    },
+}
 
 # Redis cache
 CACHES = {
@@ -140,6 +166,14 @@ AGENT_CONFIG = {
     "DEFAULT_MODEL": os.environ.get("OPENAI_MODEL", "gpt-4o-mini"),
     "EVAL_MODEL": os.environ.get("OPENAI_EVAL_MODEL", "gpt-4o"),
     "MAX_REVISIONS": 5,
+    "DRAFT_CANDIDATES": 3,
     "TAVILY_MAX_RESULTS": 5,
     "TAVILY_SEARCH_DEPTH": "basic",
+    # Semantic research cache
+    "EMBEDDING_MODEL": os.environ.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small"),
+    "SEMANTIC_CACHE_THRESHOLD": 0.92,
+    "SEMANTIC_CACHE_TTL_HOURS": 24,
+    "SEMANTIC_CACHE_SCAN_LIMIT": 200,
+    # LangGraph checkpoints in Postgres, so retried generations resume
+    "CHECKPOINTS": os.environ.get("AGENT_CHECKPOINTS", "True").lower() in ("true", "1", "yes"),
 }
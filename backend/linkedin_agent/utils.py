@@ -0,0 +1,82 @@
+"""
+Shared helpers for the HTTP-facing layers (REST API, A2A, MCP).
+JSON encoding uses orjson when available and falls back to the stdlib.
+"""
+
+import hashlib
+import json
+import re
+
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+try:
+    import orjson
+except ImportError:  # orjson is an optional speedup
+    orjson = None
+
+
+if orjson is not None:
+    # Non-str dict keys are coerced like the stdlib encoder does instead of raising
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def json_dumps(obj, sort_keys=False) -> bytes:
+        option = _ORJSON_OPTIONS | orjson.OPT_SORT_KEYS if sort_keys else _ORJSON_OPTIONS
+        return orjson.dumps(obj, default=str, option=option)
+
+    json_loads = orjson.loads
+else:
+    def json_dumps(obj, sort_keys=False) -> bytes:
+        return json.dumps(obj, default=str, sort_keys=sort_keys).encode()
+
+    json_loads = json.loads
+
+
+def word_count(text: str) -> int:
+    """Count whitespace-separated words."""
+    # str.split() runs entirely in C and beats regex scans or char loops
+    # that avoid building the list
+    return len(text.split()) if text else 0
+
+
+_APPROVED = re.compile("APPROVED", re.IGNORECASE)
+
+
+def is_approval(critique: str) -> bool:
+    """True if a critic response approves the draft (case-insensitive "APPROVED")."""
+    # A case-insensitive scan instead of `in critique.upper()`, which copies the text
+    return _APPROVED.search(critique) is not None
+
+
+def jresp(obj, status=200) -> HttpResponse:
+    """Return `obj` as a JSON HttpResponse."""
+    return HttpResponse(json_dumps(obj), status=status, content_type="application/json")
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag for an encoded response body."""
+    return f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+
+
+def etag_matches(request, etag: str) -> bool:
+    """
+    Weak If-None-Match comparison. GZipMiddleware weakens the ETag of a
+    compressed response, so clients send it back as W/"...".
+    """
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if not if_none_match:
+        return False
+    tags = {tag.removeprefix("W/") for tag in parse_etags(if_none_match)}
+    return etag.removeprefix("W/") in tags or "*" in tags
+
+
+def static_jresp(request, body: bytes, etag: str, max_age: int) -> HttpResponse:
+    """Serve a pre-encoded JSON body, answering matching If-None-Match with 304."""
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        return response
+    response = HttpResponse(body, content_type="application/json")
+    response["ETag"] = etag
+    response["Cache-Control"] = f"public, max-age={max_age}"
+    return response
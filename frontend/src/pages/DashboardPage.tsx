@@ -120,6 +120,7 @@ export default function DashboardPage() {
 function StatusBadge({ status }: { status: string }) {
   const colors: Record<string, string> = {
     draft: 'bg-gray-100 text-gray-700',
+    queued: 'bg-slate-100 text-slate-700',
     researching: 'bg-blue-100 text-blue-700',
     writing: 'bg-indigo-100 text-indigo-700',
     reviewing: 'bg-yellow-100 text-yellow-700',
@@ -7,7 +7,8 @@ import toast from 'react-hot-toast';
 import ReactMarkdown from 'react-markdown';
 
 const STATUS_COLORS: Record<string, string> = {
-  draft: 'bg-gray-100 text-gray-700', researching: 'bg-blue-100 text-blue-700',
+  draft: 'bg-gray-100 text-gray-700', queued: 'bg-slate-100 text-slate-700',
+  researching: 'bg-blue-100 text-blue-700',
   writing: 'bg-indigo-100 text-indigo-700', reviewing: 'bg-yellow-100 text-yellow-700',
   approved: 'bg-green-100 text-green-700', published: 'bg-emerald-100 text-emerald-800',
   failed: 'bg-red-100 text-red-700',
@@ -104,7 +105,7 @@ export default function ProjectDetailPage() {
   if (loading) return <div className="flex items-center justify-center h-64 text-gray-500">Loading...</div>;
   if (!project) return null;
 
-  const isGenerating = ['researching', 'writing', 'reviewing'].includes(project.status) || agentStream.isRunning;
+  const isGenerating = ['queued', 'researching', 'writing', 'reviewing'].includes(project.status) || agentStream.isRunning;
 
   return (
     <div className="max-w-5xl mx-auto space-y-6">
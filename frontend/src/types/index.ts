@@ -60,7 +60,7 @@ export interface PostProject {
   findings?: ResearchFinding[];
 }
 
-export type ProjectStatus = 'draft' | 'researching' | 'writing' | 'reviewing' | 'approved' | 'published' | 'failed';
+export type ProjectStatus = 'draft' | 'queued' | 'researching' | 'writing' | 'reviewing' | 'approved' | 'published' | 'failed';
 
 export interface AgentRun {
   id: string;